@@ -21,6 +21,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.middleware.InstrumentationMiddleware',
+    'tasks.middleware.QueryCountMiddleware',
+    'tasks.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -102,3 +105,47 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ],
 }
+
+TASKS_INSTRUMENTATION = True
+
+# /api/metrics is open here. With a token set it requires
+# "Authorization: Bearer <token>"; with neither it returns 404.
+TASKS_METRICS_PUBLIC = True
+
+TASKS_METRICS_TOKEN = None
+
+TASKS_QUERY_BUDGET_STRICT = False
+
+TASKS_TOMBSTONE_RETENTION_DAYS = 30
+
+# Finished syncs resume this far back, so rows whose transaction committed
+# after a later timestamp was sent are still delivered.
+TASKS_SYNC_SETTLE_SECONDS = 5
+
+TASKS_COMPRESSION_MIN_BYTES = 1024
+
+# Opt-in profiling of analyze and suggest. An X-Profile header triggers it
+# when DEBUG is on, or anywhere when it matches TASKS_PROFILE_TOKEN.
+TASKS_PROFILE_SAMPLE_RATE = 0.0
+
+TASKS_PROFILE_TOKEN = None
+
+TASKS_PROFILE_DIR = BASE_DIR / 'profiles'
+
+TASKS_PROFILE_KEEP = 50
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'tasks.queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
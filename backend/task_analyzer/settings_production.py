@@ -0,0 +1,122 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import REST_FRAMEWORK
+
+
+def env_list(name, default=''):
+    return [item.strip() for item in os.environ.get(name, default).split(',') if item.strip()]
+
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set for the production settings')
+
+# DEBUG = True keeps every executed query in connection.queries.
+DEBUG = False
+
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1')
+
+TASKS_ENABLE_ADMIN = env_flag('TASKS_ENABLE_ADMIN')
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'corsheaders',
+    'tasks',
+]
+
+MIDDLEWARE = [
+    'tasks.middleware.InstrumentationMiddleware',
+    'tasks.middleware.QueryCountMiddleware',
+    'tasks.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+# The API views are CSRF-exempt and use no cookies or sessions, so the CSRF,
+# session, auth, message and frame-options middleware only run with the admin.
+SILENCED_SYSTEM_CHECKS = ['security.W002', 'security.W003']
+
+if TASKS_ENABLE_ADMIN:
+    SILENCED_SYSTEM_CHECKS = []
+    INSTALLED_APPS = [
+        'django.contrib.admin',
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    ] + INSTALLED_APPS
+    MIDDLEWARE = MIDDLEWARE + [
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+    TEMPLATES[0]['OPTIONS']['context_processors'] += [
+        'django.contrib.auth.context_processors.auth',
+        'django.contrib.messages.context_processors.messages',
+    ]
+    STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', str(BASE_DIR / 'staticfiles'))  # noqa: F405
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],  # noqa: F405
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', '60')),
+    }
+}
+
+CORS_ALLOW_ALL_ORIGINS = False
+
+CORS_ALLOWED_ORIGINS = env_list('CORS_ALLOWED_ORIGINS')
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.AllowAny',
+    ],
+    'UNAUTHENTICATED_USER': None,
+}
+
+SECURE_CONTENT_TYPE_NOSNIFF = True
+
+SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https') if env_flag('DJANGO_BEHIND_PROXY') else None
+
+# /api/metrics returns 404 unless a scrape token is set, or it is made public.
+TASKS_METRICS_TOKEN = os.environ.get('TASKS_METRICS_TOKEN') or None
+
+TASKS_METRICS_PUBLIC = env_flag('TASKS_METRICS_PUBLIC')
+
+# Profiling is off unless a token or a sample rate is configured.
+TASKS_PROFILE_TOKEN = os.environ.get('TASKS_PROFILE_TOKEN') or None
+
+TASKS_PROFILE_SAMPLE_RATE = float(os.environ.get('TASKS_PROFILE_SAMPLE_RATE', '0'))
+
+TASKS_PROFILE_DIR = os.environ.get('TASKS_PROFILE_DIR', str(BASE_DIR / 'profiles'))  # noqa: F405
+
+TASKS_PROFILE_KEEP = int(os.environ.get('TASKS_PROFILE_KEEP', '50'))
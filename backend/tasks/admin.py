@@ -1,9 +1,78 @@
-from django.contrib import admin
-from .models import Task
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+from .models import Project, Task
+from .queries import estimated_row_count
+from .rescoring import annotate_live_scores, dependency_problems, rescore_tasks
+
+# Unfiltered changelists over more rows than this show the planner's row
+# estimate instead of running COUNT(*) on every page load.
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class TaskChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        self.result_list = list(self.result_list)
+        annotate_live_scores(self.result_list)
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'created_at']
+    search_fields = ['name']
+    ordering = ['name']
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
-    list_display = ['id', 'title', 'due_date', 'estimated_hours', 'importance', 'created_at']
-    list_filter = ['importance', 'due_date', 'created_at']
+    list_display = ['id', 'title', 'project', 'due_date', 'estimated_hours', 'importance',
+                    'current_score', 'dependent_count', 'priority_score', 'created_at']
+    list_filter = ['project', 'importance', 'due_date', 'created_at']
+    list_select_related = ['project']
     search_fields = ['title']
     ordering = ['-created_at']
+    readonly_fields = ['priority_score']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['rescore_selected', 'validate_dependencies']
+
+    def get_changelist(self, request, **kwargs):
+        return TaskChangeList
+
+    @admin.display(description='Current score')
+    def current_score(self, task):
+        return getattr(task, 'current_score', None)
+
+    @admin.display(description='Dependents')
+    def dependent_count(self, task):
+        return getattr(task, 'dependent_count', None)
+
+    @admin.action(description='Rescore selected tasks')
+    def rescore_selected(self, request, queryset):
+        count = rescore_tasks(queryset)
+        self.message_user(request, f'Rescored {count} task(s).', messages.SUCCESS)
+
+    @admin.action(description='Re-validate dependencies of selected tasks')
+    def validate_dependencies(self, request, queryset):
+        tasks = list(queryset)
+        problems = dependency_problems(tasks)
+        if not problems['missing'] and not problems['cycles']:
+            self.message_user(request, f'Dependencies of {len(tasks)} task(s) are valid.', messages.SUCCESS)
+            return
+        for task_id, missing in sorted(problems['missing'].items(), key=lambda item: int(item[0])):
+            self.message_user(request, f"Task {task_id} depends on missing task(s): {', '.join(missing)}",
+                              messages.WARNING)
+        for cycle in problems['cycles']:
+            self.message_user(request, f"Dependency cycle: {' -> '.join(cycle)}", messages.WARNING)
@@ -0,0 +1,186 @@
+import codecs
+import json
+from array import array
+from datetime import date
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from rest_framework import serializers
+
+from .records import TaskTable
+from .scoring import (
+    detect_table_cycles,
+    explain_index,
+    get_strategy_weights,
+    ranked_indices,
+    score_components,
+    table_components
+)
+from .serializers import TaskSerializer
+
+FORMATS = ('ndjson', 'json')
+READ_SIZE = 1 << 16
+
+
+class BatchInputError(ValueError):
+    def __init__(
+        self,
+        message: str,
+        errors: Optional[List[Tuple[int, object]]] = None,
+        cycles: Optional[List[List[str]]] = None
+    ):
+        self.errors = errors or []
+        self.cycles = cycles or []
+        super().__init__(message)
+
+
+def sniff_format(fh: BinaryIO) -> str:
+    start = fh.tell()
+    while True:
+        chunk = fh.read(256)
+        if not chunk:
+            fmt = 'ndjson'
+            break
+        stripped = chunk.lstrip()
+        if stripped:
+            fmt = 'json' if stripped.startswith(b'[') else 'ndjson'
+            break
+    fh.seek(start)
+    return fmt
+
+
+def scan_ndjson(fh: BinaryIO) -> Iterator[Tuple[int, int, object]]:
+    offset = fh.tell()
+    for line_number, line in enumerate(fh, 1):
+        if line.strip():
+            try:
+                yield offset, len(line), json.loads(line)
+            except ValueError as exc:
+                raise BatchInputError(f'Line {line_number}: invalid JSON ({exc})')
+        offset += len(line)
+
+
+def scan_json_array(fh: BinaryIO) -> Iterator[Tuple[int, int, object]]:
+    # Walks the elements of a top-level array without loading the whole file,
+    # tracking the byte range of each element so it can be read back later.
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    mark = 0
+    mark_offset = fh.tell()
+    eof = False
+    started = False
+
+    def fill():
+        nonlocal buffer, pos, mark, mark_offset, eof
+        mark_offset += len(buffer[mark:pos].encode('utf-8'))
+        chunk = fh.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + utf8.decode(chunk, final=eof)
+        pos = mark = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n' + (',' if started else ''):
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise BatchInputError('Unexpected end of file inside the task array')
+            fill()
+            continue
+        if not started:
+            if buffer[pos] != '[':
+                raise BatchInputError('Expected a JSON array of tasks')
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError as exc:
+            if eof:
+                raise BatchInputError(f'Invalid JSON ({exc})')
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            fill()
+            continue
+        start = mark_offset + len(buffer[mark:pos].encode('utf-8'))
+        length = len(buffer[pos:end].encode('utf-8'))
+        yield start, length, value
+        pos = mark = end
+        mark_offset = start + length
+
+
+SCANNERS = {'ndjson': scan_ndjson, 'json': scan_json_array}
+
+
+def build_index(fh: BinaryIO, fmt: str, max_errors: int = 20) -> Tuple[TaskTable, array, array]:
+    # First pass: validate every task and keep only what scoring needs. Titles
+    # and any other payload stay on disk; offsets and lengths point back to them.
+    validator = TaskSerializer()
+    table = TaskTable()
+    offsets = array('q')
+    lengths = array('l')
+    errors = []
+    for idx, (offset, length, item) in enumerate(SCANNERS[fmt](fh)):
+        try:
+            if not isinstance(item, dict):
+                raise serializers.ValidationError({'non_field_errors': ['Expected a task object']})
+            data = validator.run_validation(item)
+        except serializers.ValidationError as exc:
+            errors.append((idx, exc.detail))
+            if len(errors) >= max_errors:
+                break
+            continue
+        table.append(
+            data.get('id') or str(idx + 1),
+            None,
+            data.get('due_date'),
+            data.get('estimated_hours', 0),
+            data.get('importance', 5),
+            data.get('dependencies', [])
+        )
+        offsets.append(offset)
+        lengths.append(length)
+
+    if errors:
+        raise BatchInputError(f'{len(errors)} invalid task(s)', errors)
+    if not len(table):
+        raise BatchInputError('Task list cannot be empty')
+    return table, offsets, lengths
+
+
+def analyze_file(
+    fh: BinaryIO,
+    fmt: Optional[str] = None,
+    strategy: str = 'smart_balance',
+    top: Optional[int] = None,
+    current_date: Optional[date] = None,
+    max_errors: int = 20
+) -> Tuple[Dict, Iterator[Dict]]:
+    fmt = fmt or sniff_format(fh)
+    table, offsets, lengths = build_index(fh, fmt, max_errors)
+
+    cycles = detect_table_cycles(table)
+    if cycles:
+        raise BatchInputError('Circular dependencies detected', cycles=cycles)
+
+    components = table_components(table, current_date)
+    scores = score_components(components, get_strategy_weights(strategy))
+    order = ranked_indices(scores, limit=top)
+    title_field = TaskSerializer().fields['title']
+
+    def results():
+        # Second pass: read back only the tasks being written, in rank order.
+        for idx in order:
+            fh.seek(offsets[idx])
+            raw = json.loads(fh.read(lengths[idx]))
+            result = table.task_dict(idx)
+            result['title'] = title_field.run_validation(raw.get('title'))
+            result['priority_score'] = scores[idx]
+            result['explanation'] = explain_index(components, idx)
+            yield result
+
+    summary = {'strategy': strategy, 'total_tasks': len(table), 'returned_tasks': len(order)}
+    return summary, results()
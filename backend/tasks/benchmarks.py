@@ -0,0 +1,236 @@
+import json
+import platform
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from django.db import connections
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from .models import DEFAULT_PROJECT_ID, Task, bump_revision
+from .records import TaskTable
+from .scoring import calculate_priority_score, detect_circular_dependencies, get_strategy_weights, score_table
+from .search import fts_available, fts_search, icontains_search, search_terms
+from .serializers import TaskTableSerializer
+from .synthetic import SHAPES, generate_tasks
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+PRIORITY_SCORE_SAMPLE = 100
+
+SEARCH_QUERIES = ('bill', 'report exp 42', '777')
+
+# Per-benchmark size caps for cases that are too slow to run at every size.
+# Pass max_size to override.
+SIZE_LIMITS: Dict[str, int] = {}
+
+
+def bench_priority_score(tasks: List[Dict]) -> Callable[[], int]:
+    weights = get_strategy_weights('smart_balance')
+    step = max(1, len(tasks) // PRIORITY_SCORE_SAMPLE)
+    sample = tasks[::step][:PRIORITY_SCORE_SAMPLE]
+
+    def run():
+        for task in sample:
+            calculate_priority_score(task, tasks, weights)
+        return len(sample)
+    return run
+
+
+def bench_score_table(tasks: List[Dict]) -> Callable[[], int]:
+    weights = get_strategy_weights('smart_balance')
+    table = TaskTable.from_dicts(tasks)
+
+    def run():
+        score_table(table, weights)
+        return 1
+    return run
+
+
+def bench_detect_cycles(tasks: List[Dict]) -> Callable[[], int]:
+    def run():
+        detect_circular_dependencies(tasks)
+        return 1
+    return run
+
+
+def bench_serialize(tasks: List[Dict]) -> Callable[[], int]:
+    renderer = JSONRenderer()
+
+    def run():
+        serializer = TaskTableSerializer(data=tasks)
+        serializer.is_valid(raise_exception=True)
+        renderer.render(serializer.validated_data.to_dicts())
+        return 1
+    return run
+
+
+def bench_analyze_view(tasks: List[Dict]) -> Callable[[], int]:
+    from .views import analyze_tasks
+    factory = APIRequestFactory()
+    body = json.dumps(tasks)
+
+    def run():
+        request = factory.post('/api/tasks/analyze/', body, content_type='application/json')
+        response = analyze_tasks(request)
+        response.render()
+        return 1
+    return run
+
+
+def bench_suggest_view(tasks: List[Dict]) -> Callable[[], int]:
+    from .views import suggest_tasks
+    factory = APIRequestFactory()
+    load_tasks_into_db(tasks)
+
+    def run():
+        response = suggest_tasks(factory.get('/api/tasks/suggest/'))
+        response.render()
+        return 1
+    return run
+
+
+def bench_search(search: Callable) -> Callable[[List[Dict]], Callable[[], int]]:
+    def bench(tasks: List[Dict]) -> Callable[[], int]:
+        load_tasks_into_db(tasks)
+        queries = [search_terms(query) for query in SEARCH_QUERIES]
+
+        def run():
+            for terms in queries:
+                search(DEFAULT_PROJECT_ID, terms, 20, 0)
+            return len(queries)
+        return run
+    return bench
+
+
+def bench_search_fts(tasks: List[Dict]) -> Callable[[], int]:
+    if not fts_available():
+        raise RuntimeError('This SQLite build has no FTS5 support')
+    return bench_search(fts_search)(tasks)
+
+
+BENCHMARKS = {
+    'priority_score': bench_priority_score,
+    'score_table': bench_score_table,
+    'detect_cycles': bench_detect_cycles,
+    'serialize': bench_serialize,
+    'analyze_view': bench_analyze_view,
+    'suggest_view': bench_suggest_view,
+    'search_fts': bench_search_fts,
+    'search_icontains': bench_search(icontains_search),
+}
+
+DB_BENCHMARKS = {'suggest_view', 'search_fts', 'search_icontains'}
+
+
+def is_test_database(using: str = 'default') -> bool:
+    connection = connections[using]
+    name = str(connection.settings_dict['NAME'])
+    return connection.creation.is_in_memory_db(name) or name == connection.creation._get_test_db_name()
+
+
+def load_tasks_into_db(tasks: List[Dict], batch_size: int = 1000) -> None:
+    # Replaces every stored task, so it only runs against the throwaway
+    # database the benchmark and loadtest commands (or the test runner) set up.
+    if not is_test_database():
+        raise RuntimeError(
+            f"Refusing to replace the tasks in '{connections['default'].settings_dict['NAME']}': "
+            'benchmark data is only loaded into a test database'
+        )
+    Task.objects.all().delete()
+    Task.objects.bulk_create(
+        (
+            Task(
+                id=int(task['id']),
+                title=task['title'],
+                due_date=date.fromisoformat(task['due_date']) if task['due_date'] else None,
+                estimated_hours=task['estimated_hours'],
+                importance=task['importance'],
+                dependencies=task['dependencies']
+            )
+            for task in tasks
+        ),
+        batch_size=batch_size
+    )
+    bump_revision(DEFAULT_PROJECT_ID)
+
+
+def time_benchmark(run: Callable[[], int], repeat: int) -> Dict[str, float]:
+    timings = []
+    calls = 1
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = run()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        'seconds': round(best, 6),
+        'mean_seconds': round(sum(timings) / len(timings), 6),
+        'per_call_seconds': round(best / calls, 9),
+        'calls': calls,
+    }
+
+
+def result_key(name: str, shape: str, size: int) -> str:
+    return f'{name}:{shape}:{size}'
+
+
+def run_benchmarks(
+    sizes: Optional[List[int]] = None,
+    shapes: Optional[List[str]] = None,
+    benchmarks: Optional[List[str]] = None,
+    repeat: int = 3,
+    seed: int = 42,
+    max_size: Optional[int] = None,
+    progress: Optional[Callable[[str, Dict], None]] = None
+) -> Dict:
+    sizes = sizes or DEFAULT_SIZES
+    shapes = shapes or list(SHAPES)
+    benchmarks = benchmarks or list(BENCHMARKS)
+    start_date = date.today()
+
+    results = {}
+    for shape in shapes:
+        for size in sizes:
+            tasks = generate_tasks(size, shape=shape, seed=seed, start_date=start_date)
+            for name in benchmarks:
+                limit = max_size if max_size is not None else SIZE_LIMITS.get(name)
+                if limit is not None and size > limit:
+                    continue
+                run = BENCHMARKS[name](tasks)
+                key = result_key(name, shape, size)
+                results[key] = time_benchmark(run, repeat)
+                if progress:
+                    progress(key, results[key])
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'sizes': sizes,
+            'shapes': shapes,
+        },
+        'results': results,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    comparisons = []
+    baseline_results = baseline.get('results', {})
+    for key, result in current.get('results', {}).items():
+        previous = baseline_results.get(key)
+        if not previous or not previous.get('seconds'):
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        comparisons.append({
+            'key': key,
+            'baseline_seconds': previous['seconds'],
+            'current_seconds': result['seconds'],
+            'ratio': round(ratio, 3),
+            'regression': ratio > 1 + threshold,
+        })
+    return comparisons
@@ -0,0 +1,74 @@
+import heapq
+from datetime import date, timedelta
+from typing import Dict, List
+
+from .records import NO_DATE, TaskTable
+from .scoring import ranked_indices, score_components, score_index, table_components, urgency_from_days
+
+MAX_HORIZON = 365
+
+# Days-until-due values at which urgency_from_days enters a new bucket, read
+# off the function itself so they follow any change to the buckets. Urgency
+# is constant outside this window.
+URGENCY_BREAKPOINTS = tuple(
+    days for days in range(-MAX_HORIZON, MAX_HORIZON)
+    if urgency_from_days(days) != urgency_from_days(days + 1)
+)
+
+
+def urgency_events(table: TaskTable, start_date: date, horizon: int) -> Dict[int, List[int]]:
+    # Day offset -> tasks whose urgency bucket changes that day.
+    start = start_date.toordinal()
+    events: Dict[int, List[int]] = {}
+    for idx, ordinal in enumerate(table.due_ordinals):
+        if ordinal == NO_DATE:
+            continue
+        days_left = ordinal - start
+        for breakpoint in URGENCY_BREAKPOINTS:
+            offset = days_left - breakpoint
+            if 0 < offset < horizon:
+                events.setdefault(offset, []).append(idx)
+    return events
+
+
+def build_forecast(
+    table: TaskTable,
+    weights: Dict[str, float],
+    start_date: date,
+    horizon: int,
+    top: int
+) -> List[Dict]:
+    # The full table is scored once for the start date. On later days only
+    # the tasks crossing an urgency breakpoint are rescored. Urgency never
+    # falls as a due date approaches and every weight is non-negative, so
+    # scores only rise: a task outside yesterday's top can only enter it
+    # by being rescored today. Each day then ranks just yesterday's top plus
+    # today's rescored tasks, with the same tie order as ranked_indices.
+    components = table_components(table, start_date)
+    urgency = components[0]
+    scores = score_components(components, weights)
+    ranking = ranked_indices(scores, limit=top)
+
+    def snapshot(day: date) -> Dict:
+        return {
+            'date': day.isoformat(),
+            'tasks': [
+                {'id': table.ids[idx], 'title': table.titles[idx], 'priority_score': scores[idx]}
+                for idx in ranking
+            ]
+        }
+
+    days = [snapshot(start_date)]
+    start = start_date.toordinal()
+    events = urgency_events(table, start_date, horizon)
+    for offset in sorted(events):
+        changed = events[offset]
+        for idx in changed:
+            urgency[idx] = urgency_from_days(table.due_ordinals[idx] - start - offset)
+            scores[idx] = score_index(components, weights, idx)
+        candidates = set(ranking).union(changed)
+        new_ranking = heapq.nsmallest(top, candidates, key=lambda idx: (-scores[idx], idx))
+        if new_ranking != ranking:
+            ranking = new_ranking
+            days.append(snapshot(start_date + timedelta(days=offset)))
+    return days
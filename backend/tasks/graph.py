@@ -0,0 +1,241 @@
+from array import array
+from collections import deque
+from itertools import chain, count, repeat
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class GraphCycleError(ValueError):
+    pass
+
+
+class TaskGraph:
+    # Nodes are dense integers: task ids first, in order of first appearance,
+    # followed by dependency ids that do not belong to any task. Edges point
+    # from a task to the tasks it depends on and are stored in CSR form; the
+    # reverse (dependents) adjacency is built on first use.
+    __slots__ = ('ids', 'index', 'task_count', 'row_nodes', 'dep_offsets', 'dep_targets',
+                 'rev_offsets', 'rev_targets', 'dependent_counts')
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.task_count = 0
+        self.row_nodes: Optional[array] = None
+        self.dep_offsets = array('i', [0])
+        self.dep_targets = array('i')
+        self.rev_offsets: Optional[array] = None
+        self.rev_targets: Optional[array] = None
+        self.dependent_counts = array('i')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def has_duplicate_ids(self) -> bool:
+        return self.row_nodes is not None
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.dep_targets)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        dependencies: Sequence[Sequence],
+        count_dependents: bool = True
+    ) -> 'TaskGraph':
+        graph = cls()
+        index = dict(zip(ids, range(len(ids))))
+        if len(index) != len(ids):
+            return cls.build_with_duplicates(ids, dependencies)
+        graph.task_count = len(ids)
+        graph.ids = list(ids)
+        graph.index = index
+
+        # First pass: give dependency ids that are not tasks a node of their
+        # own, and count each task's edges into its offset.
+        offsets = graph.dep_offsets
+        for deps in dependencies:
+            for dep in deps:
+                dep = str(dep)
+                if dep not in index:
+                    index[dep] = len(graph.ids)
+                    graph.ids.append(dep)
+            offsets.append(offsets[-1] + len(deps))
+        offsets.extend(repeat(offsets[-1], len(graph.ids) - graph.task_count))
+
+        # Second pass: fill the targets. A task counts once per task that
+        # depends on it, however often it is listed there, and never for itself.
+        targets = graph.dep_targets = array('i', bytes(4 * offsets[-1]))
+        counts = array('i', bytes(4 * len(graph.ids)))
+        for row, deps in enumerate(dependencies):
+            start = offsets[row]
+            for pos, dep in enumerate(deps, start):
+                targets[pos] = index[str(dep)]
+            if count_dependents:
+                for node in set(targets[start:offsets[row + 1]]):
+                    if node != row:
+                        counts[node] += 1
+        if count_dependents:
+            graph.dependent_counts = counts
+        return graph
+
+    @classmethod
+    def build_with_duplicates(cls, ids: Sequence[str], dependencies: Sequence[Sequence]) -> 'TaskGraph':
+        graph = cls()
+        index = graph.index
+        node_ids = graph.ids
+        row_nodes = graph.row_nodes = array('i')
+        for task_id in ids:
+            node = index.get(task_id)
+            if node is None:
+                node = index[task_id] = len(node_ids)
+                node_ids.append(task_id)
+            row_nodes.append(node)
+        graph.task_count = len(node_ids)
+        dependencies = [list(map(str, deps)) for deps in dependencies]
+        graph.add_dangling(chain.from_iterable(dependencies))
+
+        counts = array('i', bytes(4 * len(node_ids)))
+        last_row = {}
+        for row, (own, deps) in enumerate(zip(row_nodes, dependencies)):
+            last_row[own] = row
+            for dep in set(deps):
+                dep = index[dep]
+                if dep != own:
+                    counts[dep] += 1
+        graph.dependent_counts = counts
+
+        # A task id that appears more than once keeps the dependencies of its
+        # last occurrence, matching a dict keyed by id.
+        for node in range(graph.task_count):
+            graph.dep_targets.extend(map(index.__getitem__, dependencies[last_row[node]]))
+            graph.dep_offsets.append(len(graph.dep_targets))
+        graph.dep_offsets.extend(repeat(len(graph.dep_targets), len(node_ids) - graph.task_count))
+        return graph
+
+    def add_dangling(self, dependency_ids: Iterable[str]) -> None:
+        index = self.index
+        dangling = [dep for dep in dict.fromkeys(dependency_ids) if dep not in index]
+        index.update(zip(dangling, count(len(self.ids))))
+        self.ids.extend(dangling)
+
+    @classmethod
+    def from_dicts(cls, tasks: Sequence[Dict], count_dependents: bool = True) -> 'TaskGraph':
+        return cls.build(
+            [str(task.get('id', idx)) for idx, task in enumerate(tasks)],
+            [task.get('dependencies', []) for task in tasks],
+            count_dependents
+        )
+
+    def dependencies_of(self, node: int) -> array:
+        return self.dep_targets[self.dep_offsets[node]:self.dep_offsets[node + 1]]
+
+    def dependents_of(self, node: int) -> array:
+        if self.rev_offsets is None:
+            self.build_reverse()
+        return self.rev_targets[self.rev_offsets[node]:self.rev_offsets[node + 1]]
+
+    def build_reverse(self) -> None:
+        offsets = self.dep_offsets
+        targets = self.dep_targets
+        node_count = len(self.ids)
+        rev_offsets = array('i', bytes(4 * (node_count + 1)))
+        for target in targets:
+            rev_offsets[target + 1] += 1
+        for node in range(node_count):
+            rev_offsets[node + 1] += rev_offsets[node]
+
+        # Sources are visited in order, so each node's dependents stay sorted.
+        rev_targets = array('i', bytes(4 * len(targets)))
+        cursor = array('i', rev_offsets)
+        for source in range(node_count):
+            for pos in range(offsets[source], offsets[source + 1]):
+                target = targets[pos]
+                rev_targets[cursor[target]] = source
+                cursor[target] += 1
+        self.rev_offsets = rev_offsets
+        self.rev_targets = rev_targets
+
+    def row_dependent_counts(self) -> List[int]:
+        if self.row_nodes is None:
+            return self.dependent_counts.tolist()[:self.task_count]
+        counts = self.dependent_counts
+        return [counts[node] for node in self.row_nodes]
+
+    def find_cycles(self) -> List[List[str]]:
+        offsets = self.dep_offsets
+        targets = self.dep_targets
+        visited = bytearray(len(self.ids))
+        on_path = bytearray(len(self.ids))
+        cursor = array('i', offsets)
+        cycles = []
+
+        for root in range(self.task_count):
+            if visited[root]:
+                continue
+            visited[root] = on_path[root] = 1
+            path = [root]
+            while path:
+                node = path[-1]
+                pos = cursor[node]
+                if pos == offsets[node + 1]:
+                    on_path[node] = 0
+                    path.pop()
+                    continue
+                cursor[node] = pos + 1
+                neighbor = targets[pos]
+                if not visited[neighbor]:
+                    visited[neighbor] = on_path[neighbor] = 1
+                    path.append(neighbor)
+                elif on_path[neighbor]:
+                    cycle = path[path.index(neighbor):] + [neighbor]
+                    cycles.append([self.ids[member] for member in cycle])
+                    for member in path:
+                        on_path[member] = 0
+                    break
+        return cycles
+
+    def cycle_through(self, node: int) -> Optional[List[str]]:
+        # Shortest dependency path from node back to itself, as ids starting
+        # and ending with node, or None when node is on no cycle.
+        offsets = self.dep_offsets
+        targets = self.dep_targets
+        parent: Dict[int, int] = {}
+        frontier = [node]
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for pos in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[pos]
+                    if neighbor == node:
+                        path = [current]
+                        while path[-1] != node:
+                            path.append(parent[path[-1]])
+                        return [self.ids[member] for member in [node] + path[::-1][1:] + [node]]
+                    if neighbor not in parent:
+                        parent[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
+
+    def topological_order(self) -> List[int]:
+        # Dependencies come before the tasks that depend on them.
+        offsets = self.dep_offsets
+        remaining = array('i', (offsets[node + 1] - offsets[node] for node in range(len(self.ids))))
+        ready = deque(node for node in range(len(self.ids)) if remaining[node] == 0)
+        order = []
+        while ready:
+            node = ready.popleft()
+            order.append(node)
+            for dependent in self.dependents_of(node):
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.ids):
+            raise GraphCycleError('Dependency graph contains a cycle')
+        return order
+
+    def node(self, task_id: str) -> Optional[int]:
+        return self.index.get(task_id)
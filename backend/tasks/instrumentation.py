@@ -0,0 +1,191 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...], extra: str = '') -> str:
+    parts = [f'{key}="{escape_label(value)}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[Tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        for labels, value in items:
+            yield f'{self.name}{format_labels(labels)} {format_value(value)}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self.values.get(tuple(sorted(labels.items())))
+        return state[2] if state else 0
+
+    def samples(self):
+        with self.lock:
+            items = sorted((labels, [list(state[0]), state[1], state[2]]) for labels, state in self.values.items())
+        for labels, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = f'le="{format_value(bound)}"'
+                yield f'{self.name}_bucket{format_labels(labels, le)} {cumulative}'
+            yield f'{self.name}_sum{format_labels(labels)} {format_value(total)}'
+            yield f'{self.name}_count{format_labels(labels)} {count}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.register(Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter('tasks_http_requests_total', 'HTTP requests by view, method and status code.')
+REQUEST_DURATION = REGISTRY.histogram('tasks_http_request_duration_seconds', 'Total request duration by view.')
+PHASE_DURATION = REGISTRY.histogram('tasks_phase_duration_seconds', 'Time spent in each request phase.')
+REQUEST_SIZE = REGISTRY.histogram('tasks_http_request_size_bytes', 'Request body size by view.', SIZE_BUCKETS)
+RESPONSE_SIZE = REGISTRY.histogram('tasks_http_response_size_bytes', 'Response body size by view.', SIZE_BUCKETS)
+TASK_COUNT = REGISTRY.histogram('tasks_processed_tasks', 'Number of tasks processed per request.', COUNT_BUCKETS)
+DB_QUERIES = REGISTRY.histogram('tasks_db_queries', 'SQL queries issued per request by view.', COUNT_BUCKETS)
+DB_DURATION = REGISTRY.histogram('tasks_db_query_duration_seconds', 'Time spent in the database per request by view.')
+CACHE_REQUESTS = REGISTRY.counter('tasks_cache_requests_total', 'Cache lookups by cache name and result.')
+
+
+class PhaseRecorder:
+    __slots__ = ('timings', 'task_count')
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.task_count: Optional[int] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in self.timings.items())
+
+
+class Phase:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder: PhaseRecorder, name: str):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+current_recorder: ContextVar[Optional[PhaseRecorder]] = ContextVar('tasks_phase_recorder', default=None)
+
+
+def phase(name: str):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return NULL_PHASE
+    return Phase(recorder, name)
+
+
+def record_task_count(count: int) -> None:
+    recorder = current_recorder.get()
+    if recorder is not None:
+        recorder.task_count = count
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    if current_recorder.get() is not None:
+        CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
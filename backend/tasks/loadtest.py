@@ -0,0 +1,335 @@
+import asyncio
+import json
+import platform
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+
+from .benchmarks import load_tasks_into_db
+from .overhead import wsgi_environ
+from .synthetic import generate_tasks
+
+INTERFACES = ('wsgi', 'asgi')
+ENDPOINTS = ('list', 'create', 'analyze', 'suggest')
+DEFAULT_MIX = {'list': 2, 'create': 1, 'analyze': 3, 'suggest': 4}
+PERCENTILES = (50, 95, 99)
+
+# (endpoint, method, path, query string, body)
+Request = Tuple[str, str, str, str, bytes]
+# (endpoint, status, seconds)
+Sample = Tuple[str, int, float]
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for item in value.split(','):
+        if not item.strip():
+            continue
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}', expected one of: {', '.join(ENDPOINTS)}")
+        try:
+            mix[name] = int(weight) if weight else 1
+        except ValueError:
+            raise ValueError(f"Weight for '{name}' must be an integer")
+        if mix[name] < 0:
+            raise ValueError(f"Weight for '{name}' cannot be negative")
+    if not any(mix.values()):
+        raise ValueError('The traffic mix needs at least one endpoint with a positive weight')
+    return mix
+
+
+def request_host() -> str:
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+class TrafficMix:
+    def __init__(self, mix: Dict[str, int], tasks: List[Dict], analyze_size: int = 100):
+        self.endpoints = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.endpoints]
+        # A prefix of the generated set only depends on tasks inside it.
+        self.analyze_body = json.dumps(tasks[:analyze_size]).encode()
+
+    def next_request(self, rng: random.Random) -> Request:
+        endpoint = rng.choices(self.endpoints, self.weights)[0]
+        if endpoint == 'list':
+            return endpoint, 'GET', '/api/tasks/', 'fields=id,title,importance', b''
+        if endpoint == 'create':
+            body = json.dumps({
+                'title': f'Load test task {rng.randrange(1_000_000)}',
+                'estimated_hours': rng.choice([0.5, 1, 2, 4, 8]),
+                'importance': rng.randint(1, 10),
+            }).encode()
+            return endpoint, 'POST', '/api/tasks/', '', body
+        if endpoint == 'analyze':
+            return endpoint, 'POST', '/api/tasks/analyze/', '', self.analyze_body
+        return endpoint, 'GET', '/api/tasks/suggest/', '', b''
+
+
+def wsgi_call(application: WSGIHandler, request: Request, host: str) -> int:
+    _, method, path, query_string, body = request
+    environ = wsgi_environ(method, path, body, query_string, host)
+    environ['wsgi.multithread'] = True
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_call(application: ASGIHandler, request: Request, host: str) -> int:
+    _, method, path, query_string, body = request
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', host.encode()),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+        'client': ('127.0.0.1', 0),
+        'server': (host, 80),
+    }
+    finished = asyncio.Event()
+    sent_body = False
+    status = []
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await application(scope, receive, send)
+    finished.set()
+    return status[0]
+
+
+def run_wsgi(
+    traffic: TrafficMix,
+    requests: int,
+    concurrency: int,
+    seed: int,
+    warmup: int = 0
+) -> Tuple[List[Sample], float]:
+    # One thread per simulated client, all sharing one handler the way a
+    # threaded WSGI server does. Clients draw requests until the total is met.
+    application = WSGIHandler()
+    host = request_host()
+    for idx in range(warmup):
+        wsgi_call(application, traffic.next_request(random.Random(f'{seed}:warmup:{idx}')), host)
+    samples: List[Sample] = []
+    remaining = [requests]
+    lock = threading.Lock()
+
+    def client(number: int):
+        rng = random.Random(f'{seed}:wsgi:{number}')
+        local = []
+        try:
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                request = traffic.next_request(rng)
+                start = time.perf_counter()
+                try:
+                    status = wsgi_call(application, request, host)
+                except Exception:
+                    status = 0
+                local.append((request[0], status, time.perf_counter() - start))
+        finally:
+            connections.close_all()
+            with lock:
+                samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def run_asgi(
+    traffic: TrafficMix,
+    requests: int,
+    concurrency: int,
+    seed: int,
+    warmup: int = 0
+) -> Tuple[List[Sample], float]:
+    # Concurrent client coroutines on one event loop. Django runs the sync
+    # views in its thread-sensitive executor, as it would under an ASGI server.
+    application = ASGIHandler()
+    host = request_host()
+    samples: List[Sample] = []
+    remaining = [requests]
+
+    async def client(number: int):
+        rng = random.Random(f'{seed}:asgi:{number}')
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            request = traffic.next_request(rng)
+            start = time.perf_counter()
+            try:
+                status = await asgi_call(application, request, host)
+            except Exception:
+                status = 0
+            samples.append((request[0], status, time.perf_counter() - start))
+
+    async def main():
+        for idx in range(warmup):
+            await asgi_call(application, traffic.next_request(random.Random(f'{seed}:warmup:{idx}')), host)
+        start = time.perf_counter()
+        await asyncio.gather(*(client(number) for number in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await sync_to_async(connections.close_all)()
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    return samples, elapsed
+
+
+RUNNERS: Dict[str, Callable[..., Tuple[List[Sample], float]]] = {'wsgi': run_wsgi, 'asgi': run_asgi}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile.
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    def stats(group: List[Sample]) -> Dict:
+        latencies = sorted(seconds for _, _, seconds in group)
+        errors = sum(1 for _, status, _ in group if not 200 <= status < 400)
+        result = {
+            'requests': len(group),
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0.0,
+            'throughput_rps': round(len(group) / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            'statuses': dict(sorted(Counter(str(status) for _, status, _ in group).items())),
+        }
+        for pct in PERCENTILES:
+            result[f'p{pct}_ms'] = round(percentile(latencies, pct) * 1000, 3)
+        return result
+
+    by_endpoint: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample[0], []).append(sample)
+    summary = stats(samples)
+    summary['wall_seconds'] = round(elapsed, 4)
+    summary['endpoints'] = {name: stats(group) for name, group in sorted(by_endpoint.items())}
+    return summary
+
+
+def run_load_test(
+    interfaces: Optional[List[str]] = None,
+    mix: Optional[Dict[str, int]] = None,
+    requests: int = 1000,
+    concurrency: int = 8,
+    size: int = 1000,
+    shape: str = 'random_dag',
+    analyze_size: int = 100,
+    warmup: int = 20,
+    seed: int = 42,
+    progress: Optional[Callable[[str, Dict], None]] = None
+) -> Dict:
+    interfaces = interfaces or list(INTERFACES)
+    mix = mix or DEFAULT_MIX
+    tasks = generate_tasks(size, shape=shape, seed=seed)
+    traffic = TrafficMix(mix, tasks, analyze_size)
+
+    results = {}
+    for interface in interfaces:
+        # Reload so rows created by the previous interface do not skew this one.
+        load_tasks_into_db(tasks)
+        samples, elapsed = RUNNERS[interface](traffic, requests, concurrency, seed, warmup)
+        results[interface] = summarize(samples, elapsed)
+        if progress:
+            progress(interface, results[interface])
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': settings.SETTINGS_MODULE,
+            'database': connections['default'].vendor,
+            'mix': mix,
+            'requests': requests,
+            'concurrency': concurrency,
+            'size': size,
+            'shape': shape,
+            'analyze_size': analyze_size,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare_runs(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    # A case regresses when its p95 latency grows, or its throughput drops,
+    # by more than the threshold.
+    comparisons = []
+    for interface, result in current.get('results', {}).items():
+        previous = baseline.get('results', {}).get(interface)
+        if not previous:
+            continue
+        cases = [(interface, result, previous)]
+        cases += [
+            (f'{interface}:{name}', stats, previous['endpoints'][name])
+            for name, stats in result['endpoints'].items()
+            if name in previous.get('endpoints', {})
+        ]
+        for key, stats, old in cases:
+            if not old['p95_ms'] or not old['throughput_rps']:
+                continue
+            latency_ratio = stats['p95_ms'] / old['p95_ms']
+            throughput_ratio = stats['throughput_rps'] / old['throughput_rps']
+            comparisons.append({
+                'key': key,
+                'baseline_p95_ms': old['p95_ms'],
+                'current_p95_ms': stats['p95_ms'],
+                'p95_ratio': round(latency_ratio, 3),
+                'throughput_ratio': round(throughput_ratio, 3),
+                'regression': latency_ratio > 1 + threshold or throughput_ratio < 1 - threshold,
+            })
+    return comparisons
@@ -0,0 +1,71 @@
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.batch import FORMATS, BatchInputError, analyze_file
+
+
+class Command(BaseCommand):
+    help = ('Rank the tasks in an NDJSON or JSON file like POST /api/tasks/analyze/ and stream the '
+            'result, reading the file twice instead of holding every task in memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Task file: NDJSON, or a JSON array as sent to the analyze endpoint')
+        parser.add_argument('--format', choices=FORMATS, help='Detected from the first byte when omitted')
+        parser.add_argument('--strategy', default='smart_balance')
+        parser.add_argument('--top', type=int, help='Only write the k highest-priority tasks')
+        parser.add_argument('--date', help='Score as of this date (YYYY-MM-DD) instead of today')
+        parser.add_argument('--output', default='-', help="Output file, or '-' for stdout")
+        parser.add_argument('--output-format', choices=FORMATS, default='ndjson',
+                            help='ndjson writes one task per line; json matches the analyze response')
+        parser.add_argument('--max-errors', type=int, default=20,
+                            help='Stop validating after this many invalid tasks')
+
+    def handle(self, *args, **options):
+        if options['top'] is not None and options['top'] < 1:
+            raise CommandError('--top must be positive')
+        try:
+            current_date = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError('--date must be in YYYY-MM-DD format')
+
+        try:
+            with open(options['path'], 'rb') as fh:
+                summary, results = analyze_file(
+                    fh,
+                    fmt=options['format'],
+                    strategy=options['strategy'],
+                    top=options['top'],
+                    current_date=current_date,
+                    max_errors=options['max_errors']
+                )
+                if options['output'] == '-':
+                    self.write(lambda text: self.stdout.write(text, ending=''), summary, results,
+                               options['output_format'])
+                else:
+                    with open(options['output'], 'w', encoding='utf-8') as out:
+                        self.write(out.write, summary, results, options['output_format'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except BatchInputError as exc:
+            for position, detail in exc.errors:
+                self.stderr.write(f'task {position}: {json.dumps(detail)}')
+            for cycle in exc.cycles:
+                self.stderr.write(f"cycle: {' -> '.join(cycle)}")
+            raise CommandError(str(exc))
+
+        self.stderr.write(self.style.SUCCESS(
+            f"Ranked {summary['total_tasks']} tasks, wrote {summary['returned_tasks']}"
+        ))
+
+    def write(self, emit, summary, results, output_format):
+        if output_format == 'ndjson':
+            for result in results:
+                emit(json.dumps(result) + '\n')
+            return
+        emit('{"tasks": [')
+        for idx, result in enumerate(results):
+            emit((',\n' if idx else '\n') + json.dumps(result))
+        emit(f"\n], \"strategy\": {json.dumps(summary['strategy'])}, "
+                  f"\"total_tasks\": {summary['total_tasks']}}}\n")
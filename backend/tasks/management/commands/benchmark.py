@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks.benchmarks import BENCHMARKS, DB_BENCHMARKS, DEFAULT_SIZES, compare_results, run_benchmarks
+from tasks.synthetic import SHAPES
+
+
+def parse_list(value, choices=None):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if choices is not None:
+        unknown = [item for item in items if item not in choices]
+        if unknown:
+            raise CommandError(f"Unknown value(s): {', '.join(unknown)}. Expected: {', '.join(choices)}")
+    return items
+
+
+class Command(BaseCommand):
+    help = 'Run the scoring benchmark suite on synthetic task sets and optionally compare against a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                            help='Comma-separated task counts, e.g. 100,1000,10000,100000')
+        parser.add_argument('--shapes', default=','.join(SHAPES),
+                            help=f"Comma-separated graph shapes ({', '.join(SHAPES)})")
+        parser.add_argument('--benchmarks', default=','.join(BENCHMARKS),
+                            help=f"Comma-separated benchmarks ({', '.join(BENCHMARKS)})")
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the best time is kept')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--max-size', type=int, default=None,
+                            help='Only run cases up to this many tasks, overriding the per-benchmark limits')
+        parser.add_argument('--output', help='Write the results as a JSON baseline to this path')
+        parser.add_argument('--compare', help='Compare the results against a JSON baseline')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Relative slowdown that counts as a regression (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in parse_list(options['sizes'])]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+        shapes = parse_list(options['shapes'], SHAPES)
+        benchmarks = parse_list(options['benchmarks'], list(BENCHMARKS))
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read baseline {options['compare']}: {exc}")
+
+        def progress(key, result):
+            self.stdout.write(f"{key:<40} {result['seconds'] * 1000:>12.3f} ms"
+                              f"  ({result['per_call_seconds'] * 1000:.4f} ms/call)")
+
+        needs_db = any(name in DB_BENCHMARKS for name in benchmarks)
+        old_name = connection.settings_dict['NAME']
+        if needs_db:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = run_benchmarks(
+                sizes=sizes,
+                shapes=shapes,
+                benchmarks=benchmarks,
+                repeat=options['repeat'],
+                seed=options['seed'],
+                max_size=options['max_size'],
+                progress=progress
+            )
+        finally:
+            if needs_db:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['output']}"))
+
+        if baseline is not None:
+            comparisons = compare_results(baseline, report, options['threshold'])
+            regressions = [item for item in comparisons if item['regression']]
+            for item in comparisons:
+                line = (f"{item['key']:<40} {item['baseline_seconds'] * 1000:>12.3f} ms"
+                        f" -> {item['current_seconds'] * 1000:>12.3f} ms  x{item['ratio']:.2f}")
+                self.stdout.write(self.style.ERROR(line) if item['regression'] else line)
+            if regressions:
+                raise CommandError(f'{len(regressions)} benchmark(s) regressed by more than '
+                                   f"{options['threshold']:.0%}")
+            self.stdout.write(self.style.SUCCESS('No regressions'))
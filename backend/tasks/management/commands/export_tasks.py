@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DEFAULT_PROJECT_ID, Project, Task
+from tasks.transfer import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, export_tasks
+
+
+class Command(BaseCommand):
+    help = 'Stream every task in a project to an NDJSON or CSV file without loading the table into memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Output file, or '-' for stdout")
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else ndjson')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help='Rows fetched from the database per round trip')
+        parser.add_argument('--progress-every', type=int, default=10000)
+        parser.add_argument('--project', type=int, default=DEFAULT_PROJECT_ID, help='Project id (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        if not Project.objects.filter(id=options['project']).exists():
+            raise CommandError(f"Project {options['project']} does not exist")
+
+        queryset = Task.objects.filter(project_id=options['project'])
+
+        def progress(count):
+            self.stderr.write(f'exported {count} tasks')
+
+        if path == '-':
+            total = export_tasks(sys.stdout, fmt, queryset, chunk_size=options['chunk_size'],
+                                 progress=progress, progress_every=options['progress_every'])
+        else:
+            try:
+                with open(path, 'w', newline='', encoding='utf-8') as fh:
+                    total = export_tasks(fh, fmt, queryset, chunk_size=options['chunk_size'],
+                                         progress=progress, progress_every=options['progress_every'])
+            except OSError as exc:
+                raise CommandError(f'Could not write {path}: {exc}')
+        self.stderr.write(self.style.SUCCESS(f'Exported {total} tasks as {fmt}'))
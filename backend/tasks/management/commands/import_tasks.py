@@ -0,0 +1,60 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import DEFAULT_PROJECT_ID, Project
+from tasks.transfer import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    ImportCycleError,
+    ImportRowError,
+    detect_format,
+    import_tasks
+)
+
+
+class Command(BaseCommand):
+    help = ('Stream tasks from an NDJSON or CSV export into the database in batches, '
+            'rewriting dependencies to the new task ids.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension, else ndjson')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per bulk insert')
+        parser.add_argument('--clear', action='store_true', help="Delete the project's existing tasks first")
+        parser.add_argument('--progress-every', type=int, default=10000)
+        parser.add_argument('--project', type=int, default=DEFAULT_PROJECT_ID, help='Project id (default: %(default)s)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if not Project.objects.filter(id=options['project']).exists():
+            raise CommandError(f"Project {options['project']} does not exist")
+
+        def progress(count):
+            self.stderr.write(f'imported {count} tasks')
+
+        kwargs = {
+            'fmt': fmt,
+            'batch_size': options['batch_size'],
+            'clear': options['clear'],
+            'progress': progress,
+            'progress_every': options['progress_every'],
+            'project_id': options['project'],
+        }
+        try:
+            if path == '-':
+                stats = import_tasks(sys.stdin, **kwargs)
+            else:
+                with open(path, newline='', encoding='utf-8') as fh:
+                    stats = import_tasks(fh, **kwargs)
+        except OSError as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+        except (ImportRowError, ImportCycleError) as exc:
+            raise CommandError(f'{exc}. Nothing was imported.')
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} tasks ({stats['remapped']} dependencies remapped, "
+            f"{stats['unresolved']} unresolved dropped)"
+        ))
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks.loadtest import DEFAULT_MIX, INTERFACES, compare_runs, parse_mix, run_load_test
+from tasks.synthetic import SHAPES
+
+
+class Command(BaseCommand):
+    help = ('Drive the API in-process with concurrent simulated clients through the WSGI and ASGI '
+            'handlers against a throwaway database, and report throughput and latency percentiles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interfaces', default=','.join(INTERFACES),
+                            help=f"Comma-separated handlers to drive ({', '.join(INTERFACES)})")
+        parser.add_argument('--mix', default=','.join(f'{name}={weight}' for name, weight in DEFAULT_MIX.items()),
+                            help='Relative weights per endpoint, e.g. list=2,create=1,analyze=3,suggest=4')
+        parser.add_argument('--requests', type=int, default=1000, help='Timed requests per interface')
+        parser.add_argument('--concurrency', type=int, default=8, help='Simulated clients')
+        parser.add_argument('--size', type=int, default=1000, help='Generated tasks loaded into the database')
+        parser.add_argument('--shape', choices=SHAPES, default='random_dag')
+        parser.add_argument('--analyze-size', type=int, default=100, help='Tasks per analyze payload')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per interface')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the results as JSON to this path')
+        parser.add_argument('--compare', help='Compare against a previous --output file')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Relative p95 or throughput change that counts as a regression (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        interfaces = [item.strip() for item in options['interfaces'].split(',') if item.strip()]
+        unknown = [item for item in interfaces if item not in INTERFACES]
+        if unknown:
+            raise CommandError(f"Unknown interface(s): {', '.join(unknown)}")
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for option in ('requests', 'concurrency', 'size', 'analyze_size'):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be positive")
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Could not read baseline {options['compare']}: {exc}")
+
+        def progress(interface, result):
+            self.stdout.write(f"{interface}: {result['requests']} requests in {result['wall_seconds']:.2f}s, "
+                              f"{result['throughput_rps']:.1f} req/s, {result['error_rate']:.2%} errors")
+            self.stdout.write(f"  {'endpoint':<10}{'requests':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}"
+                              f"{'p99 ms':>10}{'errors':>8}")
+            for name, stats in result['endpoints'].items():
+                line = (f"  {name:<10}{stats['requests']:>9}{stats['throughput_rps']:>9.1f}{stats['p50_ms']:>10.2f}"
+                        f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['errors']:>8}")
+                self.stdout.write(self.style.ERROR(line) if stats['errors'] else line)
+
+        # Clients run on their own threads and connections, so SQLite gets a
+        # temporary file rather than the usual in-memory test database.
+        old_name = connection.settings_dict['NAME']
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        old_test_name = test_settings.get('NAME')
+        with tempfile.TemporaryDirectory() as tmp:
+            if connection.vendor == 'sqlite':
+                test_settings['NAME'] = os.path.join(tmp, 'loadtest.sqlite3')
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                report = run_load_test(
+                    interfaces=interfaces,
+                    mix=mix,
+                    requests=options['requests'],
+                    concurrency=options['concurrency'],
+                    size=options['size'],
+                    shape=options['shape'],
+                    analyze_size=options['analyze_size'],
+                    warmup=options['warmup'],
+                    seed=options['seed'],
+                    progress=progress
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings['NAME'] = old_test_name
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if baseline is not None:
+            comparisons = compare_runs(baseline, report, options['threshold'])
+            for item in comparisons:
+                line = (f"{item['key']:<20} p95 {item['baseline_p95_ms']:>9.2f} -> {item['current_p95_ms']:>9.2f} ms"
+                        f"  x{item['p95_ratio']:.2f}  throughput x{item['throughput_ratio']:.2f}")
+                self.stdout.write(self.style.ERROR(line) if item['regression'] else line)
+            regressions = [item for item in comparisons if item['regression']]
+            if regressions:
+                raise CommandError(f'{len(regressions)} case(s) regressed by more than {options["threshold"]:.0%}')
+            self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,53 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.overhead import PROFILES, REQUEST_PATH, measure_profile
+
+COLUMNS = (
+    ('process_seconds', 'process total'),
+    ('setup_seconds', 'django setup'),
+    ('first_request_seconds', 'first request'),
+    ('request_seconds', 'warm request'),
+    ('bare_request_seconds', 'no middleware'),
+    ('middleware_overhead_seconds', 'middleware'),
+)
+
+
+class Command(BaseCommand):
+    help = ('Measure cold start (process start, Django setup, first request) and per-request '
+            'middleware overhead for each settings profile in a fresh interpreter.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default=','.join(PROFILES),
+                            help='Comma-separated settings modules to compare')
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per profile; medians are kept')
+        parser.add_argument('--requests', type=int, default=500, help='Warm requests timed per run')
+        parser.add_argument('--output', help='Write the results as JSON to this path')
+
+    def handle(self, *args, **options):
+        profiles = [item.strip() for item in options['profiles'].split(',') if item.strip()]
+        if options['runs'] < 1 or options['requests'] < 1:
+            raise CommandError('--runs and --requests must be positive')
+
+        report = {}
+        for profile in profiles:
+            try:
+                report[profile] = measure_profile(profile, options['runs'], options['requests'])
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+
+        self.stdout.write(f'POST {REQUEST_PATH}, medians of {options["runs"]} run(s), times in ms')
+        self.stdout.write(f"{'profile':<36}" + ''.join(f'{label:>15}' for _, label in COLUMNS)
+                          + f"{'apps':>6}{'mw':>4}{'modules':>9}")
+        for profile, result in report.items():
+            self.stdout.write(
+                f'{profile:<36}'
+                + ''.join(f'{result[key] * 1000:>15.3f}' for key, _ in COLUMNS)
+                + f"{result['installed_apps']:>6}{result['middleware']:>4}{result['loaded_modules']:>9}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.profiling import list_reports, load_report, profile_dir
+
+
+class Command(BaseCommand):
+    help = 'List, show or clear the profiles captured from analyze and suggest requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('report', nargs='?', help="Report id to print in full, or 'latest'")
+        parser.add_argument('--clear', action='store_true', help='Delete every stored report')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            paths = list_reports()
+            for path in paths:
+                path.unlink(missing_ok=True)
+            self.stdout.write(self.style.SUCCESS(f'Deleted {len(paths)} report(s)'))
+            return
+
+        if options['report']:
+            report = load_report(options['report'])
+            if report is None:
+                raise CommandError(f"No profile report '{options['report']}' in {profile_dir()}")
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        paths = list_reports()
+        if not paths:
+            self.stdout.write(f'No profile reports in {profile_dir()}')
+            return
+        for path in reversed(paths):
+            report = json.loads(path.read_text())
+            memory = report['memory']
+            self.stdout.write(
+                f"{report['id']}  {report['method']} {report['path']}  {report['status']}  "
+                f"{report['wall_ms']:.1f} ms  peak {memory['peak_bytes'] / 1024:.1f} KiB  ({report['trigger']})"
+            )
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.sync import prune_tombstones, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = 'Delete task tombstones older than the retention period used by /api/tasks/changes/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help='Retention in days (defaults to TASKS_TOMBSTONE_RETENTION_DAYS)')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days cannot be negative')
+        retention = timedelta(days=options['days']) if options['days'] is not None else tombstone_retention()
+        deleted = prune_tombstones(retention)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} tombstone(s) older than {retention.days} day(s)'))
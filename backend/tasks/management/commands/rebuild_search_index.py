@@ -0,0 +1,24 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tasks.search import clear_fts_cache
+
+# The schema is owned by the migration that created it. Point this at a
+# newer migration if one changes the index.
+search_migration = import_module('tasks.migrations.0004_task_search')
+
+
+class Command(BaseCommand):
+    help = 'Create the full-text search table and triggers if missing and reindex every task title.'
+
+    def handle(self, *args, **options):
+        installed = search_migration.install_search_index(connection)
+        clear_fts_cache()
+        if installed:
+            self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
+        else:
+            self.stdout.write(self.style.WARNING(
+                'Full-text search is not available on this database; search falls back to icontains'
+            ))
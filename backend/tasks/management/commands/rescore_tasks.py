@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import Project
+from tasks.rescoring import DEFAULT_BATCH_SIZE, rescore_project
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored priority_score of every task, project by project, for sorting in the admin.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, help='Only rescore this project')
+        parser.add_argument('--strategy', default='smart_balance')
+        parser.add_argument('--date', help='Score as of this day (YYYY-MM-DD) instead of today')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per bulk update')
+
+    def handle(self, *args, **options):
+        try:
+            current_date = date.fromisoformat(options['date']) if options['date'] else None
+        except ValueError:
+            raise CommandError('--date must be in YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        projects = Project.objects.order_by('id')
+        if options['project'] is not None:
+            projects = projects.filter(id=options['project'])
+            if not projects.exists():
+                raise CommandError(f"Project {options['project']} does not exist")
+
+        total = 0
+        for project in projects:
+            count = rescore_project(project.id, options['strategy'], current_date, options['batch_size'])
+            self.stdout.write(f'{project.name}: {count} task(s)')
+            total += count
+        self.stdout.write(self.style.SUCCESS(f'Rescored {total} task(s)'))
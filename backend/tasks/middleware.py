@@ -0,0 +1,189 @@
+import gzip
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from .instrumentation import (
+    DB_DURATION,
+    DB_QUERIES,
+    PHASE_DURATION,
+    REQUEST_DURATION,
+    REQUEST_SIZE,
+    REQUESTS,
+    RESPONSE_SIZE,
+    TASK_COUNT,
+    PhaseRecorder,
+    current_recorder,
+    phase,
+)
+from .queries import QueryBudgetExceeded, QueryCounter, get_query_budget
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('tasks.queries')
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Only API payloads are compressed. HTML pages can reflect user input next
+# to a CSRF token, which compression would expose to BREACH.
+COMPRESSIBLE_TYPES = ('application/json',)
+
+
+def view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'TASKS_INSTRUMENTATION', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = PhaseRecorder()
+        token = current_recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        total = time.perf_counter() - start
+        recorder.add('total', total)
+
+        name = view_name(request)
+        REQUESTS.inc(view=name, method=request.method, status=str(response.status_code))
+        REQUEST_DURATION.observe(total, view=name)
+        for phase_name, seconds in recorder.timings.items():
+            if phase_name != 'total':
+                PHASE_DURATION.observe(seconds, view=name, phase=phase_name)
+        request_size = request.META.get('CONTENT_LENGTH')
+        if request_size:
+            try:
+                REQUEST_SIZE.observe(int(request_size), view=name)
+            except ValueError:
+                pass
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), view=name)
+        if recorder.task_count is not None:
+            TASK_COUNT.observe(recorder.task_count, view=name)
+
+        response['Server-Timing'] = recorder.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        recorder = current_recorder.get()
+        if recorder is not None:
+            render_start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: recorder.add('render', time.perf_counter() - render_start)
+            )
+        return response
+
+
+class QueryCountMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        name = view_name(request)
+        recorder = current_recorder.get()
+        if recorder is not None:
+            recorder.add('db', counter.seconds)
+            DB_QUERIES.observe(counter.count, view=name)
+            DB_DURATION.observe(counter.seconds, view=name)
+
+        budget = request.query_budget
+        if budget is not None and counter.count > budget:
+            message = (f'{request.method} {request.path} ({name}) issued {counter.count} queries, '
+                       f'budget is {budget}')
+            if getattr(settings, 'TASKS_QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        else:
+            logger.debug('%s %s (%s): %d queries in %.2f ms', request.method, request.path, name,
+                         counter.count, counter.seconds * 1000)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func)
+        return None
+
+
+def accepted_encodings(header: str) -> dict:
+    encodings = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header: str):
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    candidates = (('br', 'gzip') if brotli is not None else ('gzip',))
+    best = None
+    for name in candidates:
+        quality = encodings.get(name, wildcard)
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (name, quality)
+    return best[0] if best else None
+
+
+class CompressionMiddleware:
+    # Compresses JSON response bodies above TASKS_COMPRESSION_MIN_BYTES with
+    # brotli when the package is installed and accepted, otherwise gzip.
+    def __init__(self, get_response):
+        self.min_bytes = getattr(settings, 'TASKS_COMPRESSION_MIN_BYTES', 1024)
+        if self.min_bytes is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if len(response.content) < self.min_bytes:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        with phase('compress'):
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            else:
+                compressed = gzip.compress(response.content, compresslevel=GZIP_LEVEL, mtime=0)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            response['ETag'] = response['ETag'].rstrip('"') + '-' + encoding + '"'
+        return response
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_default_project(apps, schema_editor):
+    Project = apps.get_model('tasks', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    Project.objects.get_or_create(pk=1, defaults={'name': 'Default'})
+    Task.objects.filter(project__isnull=True).update(project_id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Project',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='tasks.project'),
+        ),
+        migrations.RunPython(create_default_project, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='task',
+            name='project',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='tasks.project'),
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_updated_at_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'updated_at', 'id'], name='task_project_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasktombstone',
+            name='project_id',
+            field=models.BigIntegerField(db_index=True, default=1),
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import OperationalError, migrations
+
+# The schema is frozen here rather than imported from tasks.search, so later
+# edits to runtime code cannot change what this migration does. Changes to
+# the index belong in a new migration.
+
+FTS_TABLE = 'tasks_task_fts'
+
+# External-content FTS5 index over task titles. The triggers keep it in step
+# with every write, including bulk_create and queryset updates that skip
+# model signals.
+FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5("
+    "title, content='tasks_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title ON tasks_task BEGIN "
+    "INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO tasks_task_fts(rowid, title) VALUES (new.id, new.title); END",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+FTS_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+
+def install_search_index(connection) -> bool:
+    # Returns False, leaving the icontains fallback in place, on databases
+    # other than SQLite and on SQLite builds compiled without FTS5.
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            for statement in FTS_SCHEMA:
+                cursor.execute(statement)
+    except OperationalError as exc:
+        if 'fts5' not in str(exc):
+            raise
+        return False
+    return True
+
+
+def remove_search_index(connection) -> None:
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for statement in FTS_TEARDOWN:
+                cursor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    remove_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_projects'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_score',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at'], name='task_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['importance'], name='task_importance_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ),
+    ]
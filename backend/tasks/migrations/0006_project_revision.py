@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='revision',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -1,16 +1,92 @@
-from django.db import models
+from itertools import islice
+
+from django.db import models, transaction
+from django.db.models import F
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+DEFAULT_PROJECT_ID = 1
+TOMBSTONE_BATCH_SIZE = 1000
+
+
+class Project(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped in the same transaction as every write to the project's tasks,
+    # so per-process caches of its graph can check they are current with one
+    # primary-key lookup.
+    revision = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+def bump_revision(*project_ids) -> None:
+    # Writes that skip Task.save and the queryset delete (bulk_create,
+    # bulk_update, update) must call this for the projects they touch.
+    Project.objects.filter(pk__in=project_ids).update(revision=F('revision') + 1)
+
+
+def project_revision(project_id: int, lock: bool = False):
+    projects = Project.objects.filter(pk=project_id)
+    if lock:
+        projects = projects.select_for_update()
+    return projects.values_list('revision', flat=True).first()
+
+
+class TaskQuerySet(models.QuerySet):
+    def delete(self):
+        # Tombstones for the sync feed are written in batches before the
+        # rows go, so deleting a project's tasks stays one DELETE rather than
+        # a per-row signal and insert.
+        with transaction.atomic(using=self.db):
+            project_ids = set()
+            rows = self.values_list('id', 'project_id').iterator(chunk_size=TOMBSTONE_BATCH_SIZE)
+            while True:
+                batch = list(islice(rows, TOMBSTONE_BATCH_SIZE))
+                if not batch:
+                    break
+                TaskTombstone.objects.bulk_create(
+                    TaskTombstone(task_id=task_id, project_id=project_id) for task_id, project_id in batch
+                )
+                project_ids.update(project_id for _, project_id in batch)
+            deleted = super().delete()
+            bump_revision(*project_ids)
+            return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Task(models.Model):
+    # Tasks created without a project land in the default project, which the
+    # 0003 migration creates with this primary key.
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tasks',
+                                default=DEFAULT_PROJECT_ID)
     title = models.CharField(max_length=200)
     due_date = models.DateField(null=True, blank=True)
     estimated_hours = models.FloatField(default=0)
     importance = models.IntegerField(default=5)
     dependencies = models.JSONField(default=list, blank=True)
+    # Snapshot written by the rescore admin action and rescore_tasks command,
+    # so large changelists can sort by priority through an index. API writes
+    # do not refresh it, and scores also drift with the date and with other
+    # tasks' dependencies, so code that needs a current score must use
+    # rescoring.annotate_live_scores.
+    priority_score = models.FloatField(null=True, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'updated_at', 'id'], name='task_project_updated_idx'),
+            models.Index(fields=['-created_at'], name='task_created_at_idx'),
+            models.Index(fields=['importance'], name='task_importance_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ]
+
     def clean(self):
         if self.importance < 1 or self.importance > 10:
             raise ValidationError({'importance': 'Importance must be between 1 and 10'})
@@ -23,8 +99,19 @@ class Task(models.Model):
                 raise ValidationError({'dependencies': 'Each dependency must be an integer or string'})
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        # The foreign key constraint already guards project; validating it
+        # here would cost a lookup on every write.
+        self.full_clean(exclude=['project'])
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            bump_revision(self.project_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            TaskTombstone.objects.create(task_id=self.pk, project_id=self.project_id)
+            deleted = super().delete(*args, **kwargs)
+            bump_revision(self.project_id)
+            return deleted
 
     def is_overdue(self):
         if not self.due_date:
@@ -33,3 +120,12 @@ class Task(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class TaskTombstone(models.Model):
+    task_id = models.BigIntegerField()
+    project_id = models.BigIntegerField(default=DEFAULT_PROJECT_ID, db_index=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'Task {self.task_id} deleted at {self.deleted_at.isoformat()}'
@@ -0,0 +1,243 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from django.db import transaction
+
+from .models import Task, project_revision
+
+
+class DependencyCycleError(ValueError):
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__('Dependencies would create a cycle: ' + ' -> '.join(cycle))
+
+
+class UnknownDependencyError(ValueError):
+    def __init__(self, missing: List[str]):
+        self.missing = missing
+        super().__init__('Unknown dependencies: ' + ', '.join(missing))
+
+
+class DependencyOrder:
+    # Pearce-Kelly dynamic topological order over the stored tasks. Edges run
+    # from a dependency to the task that depends on it, and every edge keeps
+    # position[dependency] < position[task]. Adding an edge that breaks this
+    # only searches and renumbers the tasks positioned between its two ends.
+    __slots__ = ('position', 'dependents', 'dependencies', 'next_position', 'revision', 'lock')
+
+    def __init__(self):
+        self.position: Dict[str, int] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.next_position = 0
+        self.revision: Optional[int] = None
+        self.lock = threading.RLock()
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.position
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'DependencyOrder':
+        order = cls()
+        stored = {str(task_id): {str(dep) for dep in dependencies or ()} for task_id, dependencies in rows}
+        for task_id in stored:
+            order.dependents[task_id] = set()
+            order.dependencies[task_id] = set()
+
+        # Kahn's algorithm for the initial numbering. Dependencies on unknown
+        # ids are dropped; edges inside cycles saved before validation existed
+        # are left out so the order stays valid until those tasks are edited.
+        remaining = {}
+        for task_id, deps in stored.items():
+            deps = {dep for dep in deps if dep in stored and dep != task_id}
+            remaining[task_id] = len(deps)
+            for dep in deps:
+                order.dependents[dep].add(task_id)
+        ready = deque(task_id for task_id, count in remaining.items() if count == 0)
+        while ready or len(order.position) < len(stored):
+            if not ready:
+                ready.append(next(task_id for task_id in stored if task_id not in order.position))
+            task_id = ready.popleft()
+            if task_id in order.position:
+                continue
+            order.position[task_id] = order.next_position
+            order.next_position += 1
+            for dependent in order.dependents[task_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+
+        for task_id in stored:
+            for dependent in list(order.dependents[task_id]):
+                if order.position[task_id] < order.position[dependent]:
+                    order.dependencies[dependent].add(task_id)
+                else:
+                    order.dependents[task_id].discard(dependent)
+        return order
+
+    def add_task(self, task_id: str) -> None:
+        if task_id not in self.position:
+            self.position[task_id] = self.next_position
+            self.next_position += 1
+            self.dependents[task_id] = set()
+            self.dependencies[task_id] = set()
+
+    def remove_task(self, task_id: str) -> None:
+        if task_id not in self.position:
+            return
+        for dep in self.dependencies.pop(task_id):
+            self.dependents[dep].discard(task_id)
+        for dependent in self.dependents.pop(task_id):
+            self.dependencies[dependent].discard(task_id)
+        del self.position[task_id]
+
+    def check_known(self, dependencies: Iterable[str]) -> None:
+        missing = [dep for dep in dict.fromkeys(dependencies) if dep not in self.position]
+        if missing:
+            raise UnknownDependencyError(missing)
+
+    def set_dependencies(self, task_id: str, dependencies: Iterable[str]) -> None:
+        dependencies = [str(dep) for dep in dependencies]
+        self.add_task(task_id)
+        if task_id in dependencies:
+            raise DependencyCycleError([task_id, task_id])
+        self.check_known(dependencies)
+        new = set(dependencies)
+        old = self.dependencies[task_id]
+        removed = old - new
+        added = [dep for dep in dict.fromkeys(dependencies) if dep not in old]
+        for dep in removed:
+            self.unlink(dep, task_id)
+        linked = []
+        try:
+            for dep in added:
+                self.add_edge(dep, task_id)
+                linked.append(dep)
+        except DependencyCycleError:
+            # Dropping edges never invalidates the order, and the removed
+            # edges were valid before this call, so restoring them cannot fail.
+            for dep in linked:
+                self.unlink(dep, task_id)
+            for dep in removed:
+                self.add_edge(dep, task_id)
+            raise
+
+    def unlink(self, dep: str, task_id: str) -> None:
+        self.dependents[dep].discard(task_id)
+        self.dependencies[task_id].discard(dep)
+
+    def add_edge(self, dep: str, task_id: str) -> None:
+        lower = self.position[task_id]
+        upper = self.position[dep]
+        if lower < upper:
+            forward = self.search_forward(task_id, dep, upper)
+            backward = self.search_backward(dep, lower)
+            self.reorder(forward, backward)
+        self.dependents[dep].add(task_id)
+        self.dependencies[task_id].add(dep)
+
+    def search_forward(self, start: str, target: str, upper: int) -> List[str]:
+        position = self.position
+        parent: Dict[str, Optional[str]] = {start: None}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for dependent in self.dependents[node]:
+                if dependent == target:
+                    path = [node]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    # path runs target's dependent back to start; read as
+                    # "depends on" from start it is start -> target -> ... -> start.
+                    raise DependencyCycleError([start, target] + path)
+                if dependent not in parent and position[dependent] < upper:
+                    parent[dependent] = node
+                    stack.append(dependent)
+        return list(parent)
+
+    def search_backward(self, start: str, lower: int) -> List[str]:
+        position = self.position
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for dep in self.dependencies[node]:
+                if dep not in seen and position[dep] > lower:
+                    seen.add(dep)
+                    stack.append(dep)
+        return list(seen)
+
+    def reorder(self, forward: List[str], backward: List[str]) -> None:
+        position = self.position
+        forward.sort(key=position.__getitem__)
+        backward.sort(key=position.__getitem__)
+        nodes = backward + forward
+        slots = sorted(position[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            position[node] = slot
+
+    def is_consistent(self) -> bool:
+        return all(
+            self.position[dep] < self.position[task_id]
+            for task_id, deps in self.dependencies.items()
+            for dep in deps
+        )
+
+
+_orders: Dict[int, DependencyOrder] = {}
+_order_lock = threading.Lock()
+
+
+def get_order(project_id: int, revision: Optional[int] = None) -> DependencyOrder:
+    if revision is None:
+        revision = project_revision(project_id)
+    order = _orders.get(project_id)
+    if order is not None and order.revision == revision:
+        return order
+    with _order_lock:
+        order = _orders.get(project_id)
+        if order is None or order.revision != revision:
+            rows = Task.objects.filter(project_id=project_id).values_list('id', 'dependencies')
+            order = _orders[project_id] = DependencyOrder.from_rows(rows)
+            order.revision = revision
+        return order
+
+
+@contextmanager
+def locked_order(project_id: int) -> Iterator[DependencyOrder]:
+    # Runs a task write in a transaction holding the project's row lock, so
+    # writers in every process check their dependencies one at a time against
+    # the graph as committed (SQLite already serialises writers). A write
+    # that fails after changing the order drops it, and the next one reloads
+    # it from the database. Rejected cycles and unknown dependencies leave
+    # the order as it was, so those keep it.
+    with transaction.atomic():
+        revision = project_revision(project_id, lock=True)
+        while True:
+            order = get_order(project_id, revision)
+            with order.lock:
+                # Another thread may have dropped this order while we waited.
+                if _orders.get(project_id) is not order:
+                    continue
+                try:
+                    yield order
+                except (DependencyCycleError, UnknownDependencyError):
+                    raise
+                except BaseException:
+                    invalidate_order(project_id)
+                    raise
+                order.revision = project_revision(project_id)
+                return
+
+
+def current_order(project_id: int) -> Optional[DependencyOrder]:
+    return _orders.get(project_id)
+
+
+def invalidate_order(project_id: Optional[int] = None) -> None:
+    if project_id is None:
+        _orders.clear()
+    else:
+        _orders.pop(project_id, None)
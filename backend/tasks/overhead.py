@@ -0,0 +1,122 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List
+
+PROFILES = ('task_analyzer.settings', 'task_analyzer.settings_production')
+REQUEST_PATH = '/api/tasks/analyze/'
+REQUEST_BODY = json.dumps([
+    {'id': '1', 'title': 'Probe', 'due_date': None, 'estimated_hours': 1, 'importance': 5, 'dependencies': []}
+]).encode()
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def wsgi_environ(
+    method: str = 'POST',
+    path: str = REQUEST_PATH,
+    body: bytes = REQUEST_BODY,
+    query_string: str = '',
+    host: str = 'localhost'
+) -> Dict:
+    return {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def call(application) -> str:
+    statuses = []
+    body = b''.join(application(wsgi_environ(), lambda status, headers, exc_info=None: statuses.append(status)))
+    if not statuses[0].startswith('200'):
+        raise RuntimeError(f'{REQUEST_PATH} returned {statuses[0]}: {body[:200]!r}')
+    return statuses[0]
+
+
+def time_requests(application, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        call(application)
+    return (time.perf_counter() - start) / count
+
+
+def child_main(requests: int) -> None:
+    # Runs in a fresh interpreter so the import and first-request timings are cold.
+    start = time.perf_counter()
+    from django.core.wsgi import get_wsgi_application
+    application = get_wsgi_application()
+    setup = time.perf_counter()
+    call(application)
+    first = time.perf_counter()
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import override_settings
+
+    with override_settings(MIDDLEWARE=[]):
+        bare = WSGIHandler()
+    for _ in range(min(requests, 20)):
+        call(application)
+        call(bare)
+    request_seconds = time_requests(application, requests)
+    bare_seconds = time_requests(bare, requests)
+
+    json.dump({
+        'setup_seconds': setup - start,
+        'first_request_seconds': first - setup,
+        'request_seconds': request_seconds,
+        'bare_request_seconds': bare_seconds,
+        'middleware_overhead_seconds': request_seconds - bare_seconds,
+        'middleware': len(settings.MIDDLEWARE),
+        'installed_apps': len(settings.INSTALLED_APPS),
+        'debug': settings.DEBUG,
+        'loaded_modules': len(sys.modules),
+    }, sys.stdout)
+
+
+def run_child(settings_module: str, requests: int) -> Dict:
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    env.setdefault('DJANGO_SECRET_KEY', 'overhead-measurement-only')
+    code = f'from tasks.overhead import child_main; child_main({int(requests)})'
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f'{settings_module} failed to start:\n{completed.stderr.strip()}')
+    result = json.loads(completed.stdout)
+    result['process_seconds'] = elapsed
+    return result
+
+
+def measure_profile(settings_module: str, runs: int = 5, requests: int = 500) -> Dict:
+    samples: List[Dict] = [run_child(settings_module, requests) for _ in range(runs)]
+    summary = {key: statistics.median(sample[key] for sample in samples)
+               for key, value in samples[0].items() if isinstance(value, float)}
+    summary.update({key: value for key, value in samples[0].items() if not isinstance(value, float)})
+    summary['runs'] = runs
+    summary['requests'] = requests
+    return summary
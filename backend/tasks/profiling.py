@@ -0,0 +1,178 @@
+import cProfile
+import functools
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TRACE_FRAMES = 10
+TOP_ALLOCATIONS = 10
+TOP_FUNCTIONS = 15
+HOT_MODULE = os.path.join('tasks', 'scoring.py')
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent) + os.sep
+
+logger = logging.getLogger('tasks.profiling')
+
+# tracemalloc is process-wide, so only one request is profiled at a time;
+# requests that would overlap run unprofiled.
+_profile_lock = threading.Lock()
+
+
+def profile_dir() -> Path:
+    return Path(getattr(settings, 'TASKS_PROFILE_DIR', Path(settings.BASE_DIR) / 'profiles'))
+
+
+def profile_trigger(request) -> Optional[str]:
+    header = request.META.get(PROFILE_HEADER)
+    if header:
+        token = getattr(settings, 'TASKS_PROFILE_TOKEN', None)
+        if (token and hmac.compare_digest(header.encode(), token.encode())) or (settings.DEBUG and not token):
+            return 'header'
+    rate = getattr(settings, 'TASKS_PROFILE_SAMPLE_RATE', 0.0)
+    if rate and random.random() < rate:
+        return 'sample'
+    return None
+
+
+def short_path(filename: str) -> str:
+    return filename[len(BACKEND_DIR):] if filename.startswith(BACKEND_DIR) else filename
+
+
+def allocation_sites(snapshot: tracemalloc.Snapshot) -> List[Dict]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ))
+    return [
+        {
+            'file': short_path(stat.traceback[0].filename),
+            'line': stat.traceback[0].lineno,
+            'size_bytes': stat.size,
+            'count': stat.count,
+        }
+        for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]
+    ]
+
+
+def function_summary(profiler: cProfile.Profile) -> Dict:
+    stats = pstats.Stats(profiler)
+    rows = [
+        {
+            'function': name,
+            'file': short_path(filename),
+            'line': line,
+            'calls': calls,
+            'self_ms': round(self_seconds * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, self_seconds, cumulative, _) in stats.stats.items()
+    ]
+    scoring = sorted((row for row in rows if row['file'].endswith(HOT_MODULE)),
+                     key=lambda row: row['cumulative_ms'], reverse=True)
+    top = sorted(rows, key=lambda row: row['self_ms'], reverse=True)[:TOP_FUNCTIONS]
+    return {
+        'total_calls': stats.total_calls,
+        'total_ms': round(stats.total_tt * 1000, 3),
+        'scoring': scoring,
+        'top': top,
+    }
+
+
+def save_report(report: Dict) -> str:
+    # A bounded ring of JSON files: names sort by creation time, and the
+    # oldest are removed once TASKS_PROFILE_KEEP is exceeded.
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    report_id = f'{time.time_ns():020d}-{os.getpid()}-{threading.get_ident() % 10000:04d}'
+    report['id'] = report_id
+    path = directory / f'{report_id}.json'
+    temp = path.with_suffix('.tmp')
+    temp.write_text(json.dumps(report, indent=2))
+    os.replace(temp, path)
+    # Keep at least the report just written; [:-0] would delete nothing.
+    keep = max(getattr(settings, 'TASKS_PROFILE_KEEP', 50), 1)
+    for stale in sorted(directory.glob('*.json'))[:-keep]:
+        stale.unlink(missing_ok=True)
+    return report_id
+
+
+def list_reports() -> List[Path]:
+    directory = profile_dir()
+    return sorted(directory.glob('*.json')) if directory.is_dir() else []
+
+
+def load_report(report_id: str) -> Optional[Dict]:
+    paths = list_reports()
+    if report_id == 'latest':
+        path = paths[-1] if paths else None
+    else:
+        path = next((path for path in paths if path.stem == report_id), None)
+    return json.loads(path.read_text()) if path else None
+
+
+def profiled(view):
+    # Opt-in allocation and CPU profile of a view, including rendering its
+    # response. The report id is returned in the X-Profile-Id header.
+    # DRF's api_view names its wrapper 'view'; the class keeps the real name.
+    view_name = getattr(view, 'cls', view).__name__
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        trigger = profile_trigger(request)
+        if trigger is None or not _profile_lock.acquire(blocking=False):
+            return view(request, *args, **kwargs)
+        try:
+            was_tracing = tracemalloc.is_tracing()
+            if not was_tracing:
+                tracemalloc.start(TRACE_FRAMES)
+            tracemalloc.reset_peak()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                current, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                if not was_tracing:
+                    tracemalloc.stop()
+
+            report = {
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'view': view_name,
+                'method': request.method,
+                'path': request.path,
+                'query_string': request.META.get('QUERY_STRING', ''),
+                'trigger': trigger,
+                'status': response.status_code,
+                'wall_ms': round(elapsed * 1000, 3),
+                'memory': {
+                    'peak_bytes': peak,
+                    'retained_bytes': current,
+                    'top_allocations': allocation_sites(snapshot),
+                },
+                'cpu': function_summary(profiler),
+            }
+            try:
+                response['X-Profile-Id'] = save_report(report)
+            except OSError as exc:
+                logger.warning('Could not save profile of %s: %s', request.path, exc)
+            return response
+        finally:
+            _profile_lock.release()
+    return wrapper
@@ -0,0 +1,72 @@
+import time
+from contextlib import ExitStack
+from typing import Optional
+
+from django.db import DatabaseError, connections
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+# Savepoints and BEGIN come from transaction.atomic(), not from the view's
+# own data access, and depend on whether an outer transaction is open.
+TRANSACTION_STATEMENTS = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not sql.startswith(TRANSACTION_STATEMENTS):
+                self.count += 1
+            self.seconds += time.perf_counter() - start
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        for connection in connections.all():
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stack.close()
+        return False
+
+
+def estimated_row_count(model, using: str = 'default') -> Optional[int]:
+    # Planner statistics instead of a full COUNT(*). None when the database
+    # keeps none: SQLite only has them after ANALYZE, Postgres after VACUUM.
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def query_budget(limit: int):
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_query_budget(view) -> Optional[int]:
+    return getattr(view, 'query_budget', None)
@@ -0,0 +1,131 @@
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .graph import TaskGraph
+from .instrumentation import record_cache_lookup
+from .models import Task, project_revision
+from .records import TABLE_FIELDS, TaskTable
+
+ANCESTORS = 'ancestors'
+DESCENDANTS = 'descendants'
+DIRECTIONS = (ANCESTORS, DESCENDANTS)
+MAX_CACHED_NODES = 1_000_000
+
+Closure = Tuple[array, array]
+
+
+class ReachabilityIndex:
+    # The stored task graph in CSR form plus memoized closures. A closure is
+    # every node reachable from a task with its shortest distance, so
+    # depth-limited queries are answered by filtering the cached closure.
+    __slots__ = ('table', 'graph', 'revision', 'closures', 'cached_nodes', 'lock')
+
+    def __init__(self, table: TaskTable, revision: Optional[int] = None):
+        self.table = table
+        self.graph: TaskGraph = table.graph()
+        self.graph.build_reverse()
+        self.revision = revision
+        self.closures: 'OrderedDict[Tuple[str, int], Closure]' = OrderedDict()
+        self.cached_nodes = 0
+        self.lock = threading.Lock()
+
+    def node(self, task_id) -> Optional[int]:
+        node = self.graph.node(str(task_id))
+        if node is None or node >= self.graph.task_count:
+            return None
+        return node
+
+    def closure(self, node: int, direction: str) -> Closure:
+        key = (direction, node)
+        with self.lock:
+            cached = self.closures.get(key)
+            if cached is not None:
+                self.closures.move_to_end(key)
+        record_cache_lookup('reachability', cached is not None)
+        if cached is not None:
+            return cached
+
+        graph = self.graph
+        if direction == ANCESTORS:
+            offsets, targets = graph.dep_offsets, graph.dep_targets
+        else:
+            offsets, targets = graph.rev_offsets, graph.rev_targets
+        seen = bytearray(len(graph))
+        seen[node] = 1
+        nodes = array('i')
+        depths = array('i')
+        frontier = [node]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for pos in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[pos]
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        next_frontier.append(neighbor)
+            nodes.extend(next_frontier)
+            depths.extend([depth] * len(next_frontier))
+            frontier = next_frontier
+
+        result = (nodes, depths)
+        with self.lock:
+            if key not in self.closures:
+                self.closures[key] = result
+                self.cached_nodes += len(nodes)
+            while self.cached_nodes > MAX_CACHED_NODES and len(self.closures) > 1:
+                _, (evicted, _) = self.closures.popitem(last=False)
+                self.cached_nodes -= len(evicted)
+        return result
+
+    def query(self, node: int, direction: str, max_depth: Optional[int] = None, count_only: bool = False) -> Dict:
+        nodes, depths = self.closure(node, direction)
+        task_count = self.graph.task_count
+        ids = self.graph.ids
+        titles = self.table.titles
+        result = {'count': 0}
+        if not count_only:
+            result['tasks'] = []
+        for member, depth in zip(nodes, depths):
+            if max_depth is not None and depth > max_depth:
+                break
+            # Dependencies on ids that are not stored tasks are not reported.
+            if member >= task_count:
+                continue
+            result['count'] += 1
+            if not count_only:
+                result['tasks'].append({'id': ids[member], 'title': titles[member], 'depth': depth})
+        return result
+
+
+# One index per project: dependencies never cross projects, so each
+# partition is loaded and invalidated on its own.
+_indexes: Dict[int, ReachabilityIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_index(project_id: int) -> ReachabilityIndex:
+    # Every task write bumps the project's revision in its own transaction,
+    # including writes from other processes, so a matching revision means
+    # the cached graph is current. The revision is read before the rows, so
+    # a write landing in between only costs another reload.
+    revision = project_revision(project_id)
+    index = _indexes.get(project_id)
+    if index is not None and index.revision == revision:
+        return index
+    with _index_lock:
+        index = _indexes.get(project_id)
+        if index is None or index.revision != revision:
+            rows = Task.objects.filter(project_id=project_id).values_list(*TABLE_FIELDS)
+            index = _indexes[project_id] = ReachabilityIndex(TaskTable.from_rows(rows), revision)
+        return index
+
+
+def invalidate_index(project_id: Optional[int] = None) -> None:
+    if project_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(project_id, None)
@@ -0,0 +1,187 @@
+from array import array
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .graph import TaskGraph
+
+NO_DATE = 0
+
+TABLE_FIELDS = ('id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies')
+
+COLUMNS = {
+    'id': 'ids',
+    'title': 'titles',
+    'due_date': 'due_dates',
+    'estimated_hours': 'estimated_hours',
+    'importance': 'importance',
+    'dependencies': 'dependencies',
+}
+
+
+def due_date_ordinal(due_date) -> int:
+    if not due_date:
+        return NO_DATE
+    try:
+        due = date.fromisoformat(due_date) if isinstance(due_date, str) else due_date
+        return due.toordinal()
+    except (ValueError, AttributeError):
+        return NO_DATE
+
+
+class TaskRecord:
+    __slots__ = ('id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies')
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        due_date: Optional[str] = None,
+        estimated_hours: float = 0,
+        importance: int = 5,
+        dependencies: Tuple[str, ...] = ()
+    ):
+        self.id = id
+        self.title = title
+        self.due_date = due_date
+        self.estimated_hours = estimated_hours
+        self.importance = importance
+        self.dependencies = dependencies
+
+    @classmethod
+    def from_dict(cls, task: Dict, default_id: Optional[str] = None) -> 'TaskRecord':
+        task_id = task.get('id') or default_id
+        return cls(
+            id=str(task_id) if task_id is not None else None,
+            title=task.get('title'),
+            due_date=task.get('due_date'),
+            estimated_hours=task.get('estimated_hours', 0),
+            importance=task.get('importance', 5),
+            dependencies=tuple(str(dep) for dep in task.get('dependencies', []) or [])
+        )
+
+    def get(self, name: str, default=None):
+        value = getattr(self, name, default)
+        if name == 'dependencies':
+            return list(value)
+        return value
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'title': self.title,
+            'due_date': self.due_date,
+            'estimated_hours': self.estimated_hours,
+            'importance': self.importance,
+            'dependencies': list(self.dependencies),
+        }
+
+    def __repr__(self):
+        return f'TaskRecord(id={self.id!r}, title={self.title!r})'
+
+
+class TaskTable:
+    __slots__ = ('ids', 'titles', 'due_dates', 'due_ordinals', 'estimated_hours', 'importance',
+                 'dependencies', '_interned', '_graph')
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.due_dates: List[Optional[str]] = []
+        self.due_ordinals = array('l')
+        self.estimated_hours = array('d')
+        self.importance = array('h')
+        self.dependencies: List[Tuple[str, ...]] = []
+        self._interned: Dict[str, str] = {}
+        self._graph: Optional[TaskGraph] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, value) -> str:
+        value = str(value)
+        return self._interned.setdefault(value, value)
+
+    def append(
+        self,
+        id,
+        title: str,
+        due_date: Optional[str] = None,
+        estimated_hours: float = 0,
+        importance: int = 5,
+        dependencies: Iterable = ()
+    ) -> int:
+        self._graph = None
+        self.ids.append(self.intern(id))
+        self.titles.append(title)
+        self.due_dates.append(due_date or None)
+        self.due_ordinals.append(due_date_ordinal(due_date))
+        self.estimated_hours.append(float(estimated_hours or 0))
+        self.importance.append(int(importance))
+        self.dependencies.append(tuple(self.intern(dep) for dep in dependencies or ()))
+        return len(self.ids) - 1
+
+    def append_dict(self, task: Dict, default_id: Optional[str] = None) -> int:
+        due_date = task.get('due_date')
+        if due_date is not None and not isinstance(due_date, str):
+            due_date = due_date.isoformat()
+        return self.append(
+            task.get('id') or default_id,
+            task.get('title'),
+            due_date,
+            task.get('estimated_hours', 0),
+            task.get('importance', 5),
+            task.get('dependencies', [])
+        )
+
+    @classmethod
+    def from_dicts(cls, tasks: Iterable[Dict]) -> 'TaskTable':
+        table = cls()
+        for idx, task in enumerate(tasks):
+            table.append_dict(task, default_id=str(idx + 1))
+        return table
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'TaskTable':
+        table = cls()
+        for task_id, title, due_date, estimated_hours, importance, dependencies in rows:
+            table.append(task_id, title, due_date.isoformat() if due_date else None,
+                         estimated_hours, importance, dependencies)
+        return table
+
+    def record(self, index: int) -> TaskRecord:
+        return TaskRecord(
+            self.ids[index],
+            self.titles[index],
+            self.due_dates[index],
+            self.estimated_hours[index],
+            self.importance[index],
+            self.dependencies[index]
+        )
+
+    def records(self) -> Iterator[TaskRecord]:
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def task_dict(self, index: int, fields: Optional[Iterable[str]] = None) -> Dict:
+        if fields is not None:
+            return {field: self.value(field, index) for field in fields}
+        return {
+            'id': self.ids[index],
+            'title': self.titles[index],
+            'due_date': self.due_dates[index],
+            'estimated_hours': self.estimated_hours[index],
+            'importance': self.importance[index],
+            'dependencies': list(self.dependencies[index]),
+        }
+
+    def value(self, field: str, index: int):
+        value = getattr(self, COLUMNS[field])[index]
+        return list(value) if field == 'dependencies' else value
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.task_dict(index) for index in range(len(self))]
+
+    def graph(self) -> TaskGraph:
+        if self._graph is None:
+            self._graph = TaskGraph.build(self.ids, self.dependencies)
+        return self._graph
@@ -0,0 +1,98 @@
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+from .models import Task
+from .reachability import get_index
+from .records import TABLE_FIELDS, TaskTable
+from .scoring import get_strategy_weights, score_components, score_table, table_components
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def group_by_project(tasks: Iterable[Task]) -> Dict[int, List[Task]]:
+    groups: Dict[int, List[Task]] = {}
+    for task in tasks:
+        groups.setdefault(task.project_id, []).append(task)
+    return groups
+
+
+def annotate_live_scores(
+    tasks: Iterable[Task],
+    strategy: str = 'smart_balance',
+    current_date: Optional[date] = None
+) -> None:
+    # Sets current_score and dependent_count on each task. Dependent counts
+    # come from the project's cached graph, so a page of tasks costs one
+    # revision lookup per project instead of a scan per row. This is the
+    # score to show; Task.priority_score is only as fresh as the last rescore.
+    weights = get_strategy_weights(strategy)
+    for project_id, group in group_by_project(tasks).items():
+        graph = get_index(project_id).graph
+        blocked = []
+        for task in group:
+            node = graph.node(str(task.id))
+            blocked.append(graph.dependent_counts[node] if node is not None else 0)
+        table = TaskTable.from_rows(
+            (task.id, task.title, task.due_date, task.estimated_hours, task.importance, task.dependencies)
+            for task in group
+        )
+        scores = score_components(table_components(table, current_date, blocked), weights)
+        for task, score, count in zip(group, scores, blocked):
+            task.current_score = score
+            task.dependent_count = count
+
+
+def rescore_tasks(
+    tasks: Iterable[Task],
+    strategy: str = 'smart_balance',
+    current_date: Optional[date] = None
+) -> int:
+    tasks = list(tasks)
+    annotate_live_scores(tasks, strategy, current_date)
+    for task in tasks:
+        task.priority_score = task.current_score
+    # bulk_update leaves updated_at alone, so a rescore is not a sync change.
+    Task.objects.bulk_update(tasks, ['priority_score'], batch_size=DEFAULT_BATCH_SIZE)
+    return len(tasks)
+
+
+def rescore_project(
+    project_id: int,
+    strategy: str = 'smart_balance',
+    current_date: Optional[date] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    rows = Task.objects.filter(project_id=project_id).order_by('id').values_list(*TABLE_FIELDS)
+    table = TaskTable.from_rows(rows.iterator(chunk_size=batch_size))
+    scores = score_table(table, get_strategy_weights(strategy), current_date)
+    for start in range(0, len(table), batch_size):
+        Task.objects.bulk_update(
+            [Task(id=int(table.ids[idx]), priority_score=scores[idx])
+             for idx in range(start, min(start + batch_size, len(table)))],
+            ['priority_score']
+        )
+    return len(table)
+
+
+def dependency_problems(tasks: Iterable[Task]) -> Dict[str, object]:
+    # Dependencies on ids outside the task's project, and stored cycles that
+    # pass through a selected task. Each selected task is searched for a path
+    # back to itself; a task already on a reported cycle is not searched again.
+    missing: Dict[str, List[str]] = {}
+    cycles: List[List[str]] = []
+    for project_id, group in group_by_project(tasks).items():
+        graph = get_index(project_id).graph
+        on_cycle = set()
+        for task in group:
+            nodes = [(str(dep), graph.node(str(dep))) for dep in task.dependencies]
+            unknown = [dep for dep, node in nodes if node is None or node >= graph.task_count]
+            if unknown:
+                missing[str(task.id)] = unknown
+            node = graph.node(str(task.id))
+            if node is None or str(task.id) in on_cycle:
+                continue
+            cycle = graph.cycle_through(node)
+            if cycle is not None:
+                cycles.append(cycle)
+                on_cycle.update(cycle)
+    return {'missing': missing, 'cycles': cycles}
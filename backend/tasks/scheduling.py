@@ -0,0 +1,68 @@
+import heapq
+from array import array
+from datetime import date, timedelta
+from typing import Dict, List
+
+from .records import TaskTable
+
+EPSILON = 1e-9
+
+
+def build_schedule(table: TaskTable, scores: array, daily_capacity: float, start_date: date) -> List[Dict]:
+    # List scheduling over the dependency DAG: a task is released once all of
+    # its dependencies are complete, and the released task with the highest
+    # score is worked on next. Dependencies on ids outside the table are
+    # treated as already done. The caller must reject cyclic tables first.
+    if daily_capacity <= 0:
+        raise ValueError('Daily capacity must be positive')
+    graph = table.graph()
+    task_count = graph.task_count
+    offsets = graph.dep_offsets
+    targets = graph.dep_targets
+
+    waiting = array('i', bytes(4 * task_count))
+    for node in range(task_count):
+        for pos in range(offsets[node], offsets[node + 1]):
+            if targets[pos] < task_count:
+                waiting[node] += 1
+
+    released = [(-scores[node], node) for node in range(task_count) if waiting[node] == 0]
+    heapq.heapify(released)
+
+    days: List[Dict] = []
+    day_index = -1
+    used = daily_capacity
+    while released:
+        _, node = heapq.heappop(released)
+        hours = table.estimated_hours[node]
+        remaining = hours
+        while True:
+            if used >= daily_capacity - EPSILON and (remaining > EPSILON or day_index < 0):
+                day_index += 1
+                used = 0.0
+                days.append({
+                    'date': (start_date + timedelta(days=day_index)).isoformat(),
+                    'hours': 0.0,
+                    'tasks': [],
+                })
+            portion = min(remaining, daily_capacity - used)
+            used += portion
+            remaining -= portion
+            day = days[day_index]
+            day['hours'] = round(used, 4)
+            day['tasks'].append({
+                'id': table.ids[node],
+                'title': table.titles[node],
+                'hours': round(portion, 4),
+                'estimated_hours': hours,
+                'priority_score': scores[node],
+                'completes': remaining <= EPSILON,
+            })
+            if remaining <= EPSILON:
+                break
+
+        for dependent in graph.dependents_of(node):
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                heapq.heappush(released, (-scores[dependent], dependent))
+    return days
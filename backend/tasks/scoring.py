@@ -1,5 +1,11 @@
 from datetime import date
-from typing import Dict, List, Optional, Set
+import heapq
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .instrumentation import phase
+from .graph import TaskGraph
+from .records import NO_DATE, TaskTable
 
 def calculate_urgency_score(due_date: Optional[str], current_date: date = None) -> float:
     if current_date is None:
@@ -13,8 +19,9 @@ def calculate_urgency_score(due_date: Optional[str], current_date: date = None)
     except (ValueError, AttributeError):
         return 0.5
     
-    days_until_due = (due - current_date).days
-    
+    return urgency_from_days((due - current_date).days)
+
+def urgency_from_days(days_until_due: int) -> float:
     if days_until_due < 0:
         overdue_penalty = abs(days_until_due) * 0.1
         return min(1.0, 0.9 + overdue_penalty)
@@ -71,8 +78,9 @@ def count_blocked_tasks(task_id: str, all_tasks: List[Dict]) -> int:
 
 def calculate_dependency_score(task: Dict, all_tasks: List[Dict]) -> float:
     task_id = task.get('id') or task.get('title', '')
-    blocked_count = count_blocked_tasks(task_id, all_tasks)
-    
+    return dependency_score_from_count(count_blocked_tasks(task_id, all_tasks))
+
+def dependency_score_from_count(blocked_count: int) -> float:
     if blocked_count == 0:
         return 0.5
     
@@ -128,8 +136,11 @@ def get_score_explanation(
     urgency = calculate_urgency_score(task.get('due_date'))
     importance = calculate_importance_score(task.get('importance', 5))
     effort = calculate_effort_score(task.get('estimated_hours', 0))
-    dependencies = calculate_dependency_score(task, all_tasks)
+    blocked = count_blocked_tasks(task.get('id') or task.get('title', ''), all_tasks)
     
+    return explain_components(urgency, importance, effort, blocked)
+
+def explain_components(urgency: float, importance: float, effort: float, blocked: int) -> str:
     parts = []
     
     if urgency >= 0.8:
@@ -151,53 +162,93 @@ def get_score_explanation(
     elif effort <= 0.3:
         parts.append("high effort")
     
-    blocked = count_blocked_tasks(task.get('id') or task.get('title', ''), all_tasks)
     if blocked > 0:
         parts.append(f"blocks {blocked} task(s)")
     
     return ", ".join(parts) if parts else "standard priority"
 
 def detect_circular_dependencies(all_tasks: List[Dict]) -> List[List[str]]:
-    graph = {}
-    task_ids = {}
+    with phase('cycles'):
+        return TaskGraph.from_dicts(all_tasks, count_dependents=False).find_cycles()
+
+def detect_table_cycles(table: TaskTable) -> List[List[str]]:
+    with phase('cycles'):
+        return table.graph().find_cycles()
+
+def count_dependents(table: TaskTable) -> List[int]:
+    return table.graph().row_dependent_counts()
+
+def table_components(
+    table: TaskTable,
+    current_date: date = None,
+    blocked: Optional[List[int]] = None
+) -> Tuple[array, array, array, List[int]]:
+    if current_date is None:
+        current_date = date.today()
+    today = current_date.toordinal()
     
-    for idx, task in enumerate(all_tasks):
-        task_id = str(task.get('id', idx))
-        task_ids[task_id] = task
-        graph[task_id] = []
-        deps = task.get('dependencies', [])
-        for dep in deps:
-            dep_str = str(dep)
-            graph[task_id].append(dep_str)
-    
-    def dfs(node: str, visited: Set[str], rec_stack: Set[str], path: List[str]) -> Optional[List[str]]:
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-        
-        for neighbor in graph.get(node, []):
-            if neighbor not in visited:
-                cycle = dfs(neighbor, visited, rec_stack, path)
-                if cycle:
-                    return cycle
-            elif neighbor in rec_stack:
-                cycle_start = path.index(neighbor)
-                return path[cycle_start:] + [neighbor]
-        
-        rec_stack.remove(node)
-        path.pop()
-        return None
-    
-    cycles = []
-    visited = set()
-    
-    for task_id in graph:
-        if task_id not in visited:
-            cycle = dfs(task_id, visited, set(), [])
-            if cycle:
-                cycles.append(cycle)
-    
-    return cycles
+    urgency = array('d', (
+        0.5 if ordinal == NO_DATE else urgency_from_days(ordinal - today)
+        for ordinal in table.due_ordinals
+    ))
+    importance = array('d', (calculate_importance_score(value) for value in table.importance))
+    effort = array('d', (calculate_effort_score(value) for value in table.estimated_hours))
+    # Callers scoring a subset of a larger graph pass its dependent counts.
+    return urgency, importance, effort, count_dependents(table) if blocked is None else blocked
+
+def score_components(
+    components: Tuple[array, array, array, List[int]],
+    weights: Optional[Dict[str, float]] = None
+) -> array:
+    if weights is None:
+        weights = get_strategy_weights('smart_balance')
+    urgency, importance, effort, blocked = components
+    w_urgency = weights['urgency']
+    w_importance = weights['importance']
+    w_effort = weights['effort']
+    w_dependencies = weights['dependencies']
+    
+    return array('d', (
+        round(
+            urgency[idx] * w_urgency +
+            importance[idx] * w_importance +
+            effort[idx] * w_effort +
+            dependency_score_from_count(blocked[idx]) * w_dependencies,
+            4
+        )
+        for idx in range(len(urgency))
+    ))
+
+def explain_index(components: Tuple[array, array, array, List[int]], idx: int) -> str:
+    urgency, importance, effort, blocked = components
+    return explain_components(urgency[idx], importance[idx], effort[idx], blocked[idx])
+
+def score_index(
+    components: Tuple[array, array, array, List[int]],
+    weights: Dict[str, float],
+    idx: int
+) -> float:
+    # Same expression as score_components, for rescoring a single task.
+    urgency, importance, effort, blocked = components
+    return round(
+        urgency[idx] * weights['urgency'] +
+        importance[idx] * weights['importance'] +
+        effort[idx] * weights['effort'] +
+        dependency_score_from_count(blocked[idx]) * weights['dependencies'],
+        4
+    )
+
+def score_table(
+    table: TaskTable,
+    weights: Optional[Dict[str, float]] = None,
+    current_date: date = None
+) -> array:
+    return score_components(table_components(table, current_date), weights)
+
+def ranked_indices(scores: array, limit: Optional[int] = None) -> List[int]:
+    if limit is not None:
+        return heapq.nlargest(limit, range(len(scores)), key=scores.__getitem__)
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
 
 def get_strategy_weights(strategy: str) -> Dict[str, float]:
     strategies = {
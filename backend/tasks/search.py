@@ -0,0 +1,86 @@
+import re
+from typing import Dict, List
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+
+from .models import Task
+from .sync import task_dict
+
+FTS_TABLE = 'tasks_task_fts'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+TERM_RE = re.compile(r'\w+')
+
+# The index and its triggers are created by migration 0004_task_search. A
+# migration that rebuilds tasks_task drops the triggers, so run
+# rebuild_search_index afterwards.
+_fts_tables: Dict[str, bool] = {}
+
+
+def clear_fts_cache() -> None:
+    _fts_tables.clear()
+
+
+def fts_available(using: str = 'default') -> bool:
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = f"{using}:{connection.settings_dict['NAME']}"
+    available = _fts_tables.get(key)
+    if available is None:
+        with connection.cursor() as cursor:
+            available = FTS_TABLE in connection.introspection.table_names(cursor)
+        _fts_tables[key] = available
+    return available
+
+
+def search_terms(query: str) -> List[str]:
+    return TERM_RE.findall(query.lower())
+
+
+def fts_search(project_id: int, terms: List[str], limit: int, offset: int) -> List[Task]:
+    # Every term is a quoted prefix query, so user input cannot inject FTS
+    # syntax, and "rep sta" matches "Report status". bm25 ranks the matches.
+    match = ' '.join(f'"{term}"*' for term in terms)
+    sql = (
+        f'SELECT t.*, {FTS_TABLE}.rank AS search_rank FROM {FTS_TABLE} '
+        f'JOIN tasks_task t ON t.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s AND t.project_id = %s '
+        f'ORDER BY {FTS_TABLE}.rank, t.id LIMIT %s OFFSET %s'
+    )
+    return list(Task.objects.raw(sql, [match, project_id, limit, offset]))
+
+
+def icontains_search(project_id: int, terms: List[str], limit: int, offset: int) -> List[Task]:
+    # Substring scan for databases without FTS5: titles starting with the
+    # first term rank first, then shorter titles.
+    tasks = Task.objects.filter(project_id=project_id)
+    for term in terms:
+        tasks = tasks.filter(title__icontains=term)
+    tasks = tasks.annotate(search_rank=Case(
+        When(title__istartswith=terms[0], then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField()
+    )).order_by('search_rank', Length('title'), 'id')
+    return list(tasks[offset:offset + limit])
+
+
+def search_tasks(project_id: int, query: str, limit: int = DEFAULT_LIMIT, offset: int = 0) -> Dict:
+    terms = search_terms(query)
+    if not terms:
+        raise ValueError('Search query must contain at least one word')
+    backend = 'fts5' if fts_available() else 'icontains'
+    search = fts_search if backend == 'fts5' else icontains_search
+    page = search(project_id, terms, limit + 1, offset)
+    has_more = len(page) > limit
+    page = page[:limit]
+    return {
+        'query': query,
+        'backend': backend,
+        'results': [task_dict(task) for task in page],
+        'offset': offset,
+        'next_offset': offset + limit if has_more else None,
+        'has_more': has_more,
+    }
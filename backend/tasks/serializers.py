@@ -1,5 +1,10 @@
 from rest_framework import serializers
 from datetime import datetime
+from .records import TaskTable
+
+class ProjectSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100, required=True)
+
 
 class TaskSerializer(serializers.Serializer):
     id = serializers.CharField(required=False, allow_null=True)
@@ -44,3 +49,27 @@ class TaskSerializer(serializers.Serializer):
             raise serializers.ValidationError("Dependencies must be a list")
         return value
 
+
+class TaskTableSerializer(serializers.ListSerializer):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('child', TaskSerializer())
+        super().__init__(*args, **kwargs)
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+        
+        table = TaskTable()
+        errors = []
+        for idx, item in enumerate(data):
+            try:
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append(exc.detail)
+            else:
+                table.append_dict(validated, default_id=str(idx + 1))
+                errors.append({})
+        
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return table
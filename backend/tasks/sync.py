@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+# (timestamp, id) of the last row sent.
+Cursor = Tuple[datetime, int]
+
+
+class SyncTokenError(ValueError):
+    pass
+
+
+class SyncTokenExpired(SyncTokenError):
+    pass
+
+
+def tombstone_retention() -> timedelta:
+    return timedelta(days=getattr(settings, 'TASKS_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def to_micros(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def settle_window() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'TASKS_SYNC_SETTLE_SECONDS', 5))
+
+
+def encode_token(issued_at: datetime, started_at: Optional[datetime], task_cursor: Cursor,
+                 tombstone_cursor: Cursor) -> str:
+    # started_at is set while a sync is paging and is 0 once it has finished.
+    return '-'.join(str(part) for part in (
+        to_micros(issued_at),
+        to_micros(started_at) if started_at else 0,
+        to_micros(task_cursor[0]), task_cursor[1],
+        to_micros(tombstone_cursor[0]), tombstone_cursor[1],
+    ))
+
+
+def decode_token(token: str) -> Tuple[datetime, Optional[datetime], Cursor, Cursor]:
+    try:
+        parts = [int(part) for part in token.split('-')]
+    except ValueError:
+        raise SyncTokenError('Invalid sync token')
+    if len(parts) != 6 or min(parts) < 0:
+        raise SyncTokenError('Invalid sync token')
+    issued, started, updated, task_id, deleted, tombstone_id = parts
+    return (from_micros(issued), from_micros(started) if started else None,
+            (from_micros(updated), task_id), (from_micros(deleted), tombstone_id))
+
+
+def after_cursor(queryset, field: str, cursor: Cursor):
+    moment, row_id = cursor
+    return queryset.filter(**{f'{field}__gte': moment}).exclude(**{field: moment, 'id__lte': row_id})
+
+
+def task_dict(task: Task) -> Dict:
+    return {
+        'id': str(task.id),
+        'title': task.title,
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'estimated_hours': task.estimated_hours,
+        'importance': task.importance,
+        'dependencies': task.dependencies,
+        'created_at': task.created_at.isoformat(),
+        'updated_at': task.updated_at.isoformat()
+    }
+
+
+def changes_since(project_id: int, token: Optional[str], limit: int = DEFAULT_LIMIT) -> Dict:
+    # Tasks are paged by (updated_at, id) and tombstones by (deleted_at, id),
+    # both under one limit. Timestamps are taken at save time, not commit
+    # time, so a slow transaction can land behind a cursor already handed
+    # out. import_tasks, the one long-running writer, stamps its rows again
+    # once it has committed. For the short API writes, when a sync finishes
+    # (has_more is false) both cursors are moved back to the settle window
+    # before the sync began, and the next sync sends anything newer again.
+    # Clients apply changes by id, so repeats are harmless. Without a token
+    # every task is returned and old tombstones are skipped.
+    now = timezone.now()
+    project_tasks = Task.objects.filter(project_id=project_id)
+    project_tombstones = TaskTombstone.objects.filter(project_id=project_id)
+    started_at = now
+    if token:
+        issued_at, continued_from, task_cursor, tombstone_cursor = decode_token(token)
+        if issued_at < now - tombstone_retention():
+            raise SyncTokenExpired('Sync token is older than the tombstone retention period')
+        started_at = continued_from or now
+    else:
+        task_cursor = (EPOCH, 0)
+        tombstone_cursor = (now - settle_window(), 0)
+
+    page = list(after_cursor(project_tasks, 'updated_at', task_cursor).order_by('updated_at', 'id')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    remaining = limit - len(page)
+    tombstones = list(
+        after_cursor(project_tombstones, 'deleted_at', tombstone_cursor)
+        .order_by('deleted_at', 'id').values_list('deleted_at', 'id', 'task_id')[:remaining + 1]
+    )
+    has_more = has_more or len(tombstones) > remaining
+    tombstones = tombstones[:remaining]
+
+    if page:
+        task_cursor = (page[-1].updated_at, page[-1].id)
+    if tombstones:
+        tombstone_cursor = tombstones[-1][:2]
+    if not has_more:
+        horizon = (started_at - settle_window(), 0)
+        task_cursor = min(task_cursor, horizon)
+        tombstone_cursor = min(tombstone_cursor, horizon)
+
+    return {
+        'tasks': [task_dict(task) for task in page],
+        'deleted': [str(deleted_id) for _, _, deleted_id in tombstones],
+        'token': encode_token(now, started_at if has_more else None, task_cursor, tombstone_cursor),
+        'has_more': has_more,
+    }
+
+
+def prune_tombstones(retention: Optional[timedelta] = None) -> int:
+    cutoff = timezone.now() - (retention if retention is not None else tombstone_retention())
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,63 @@
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+SHAPES = ('chain', 'fanout', 'random_dag', 'independent')
+
+TITLE_VERBS = ['Fix', 'Write', 'Review', 'Refactor', 'Deploy', 'Test', 'Design', 'Document', 'Plan', 'Migrate']
+TITLE_NOUNS = ['login bug', 'API docs', 'release notes', 'billing module', 'search index', 'dashboard',
+               'onboarding flow', 'database schema', 'CI pipeline', 'payment gateway', 'report export']
+
+
+def random_due_date(rng: random.Random, start_date: date) -> Optional[str]:
+    bucket = rng.random()
+    if bucket < 0.10:
+        return None
+    if bucket < 0.20:
+        offset = -rng.randint(1, 30)
+    elif bucket < 0.30:
+        offset = rng.randint(0, 1)
+    elif bucket < 0.55:
+        offset = rng.randint(2, 14)
+    else:
+        offset = rng.randint(15, 90)
+    return (start_date + timedelta(days=offset)).isoformat()
+
+
+def random_dependencies(rng: random.Random, shape: str, idx: int, hubs: int) -> List[str]:
+    if idx == 0 or shape == 'independent':
+        return []
+    if shape == 'chain':
+        return [str(idx)]
+    if shape == 'fanout':
+        if idx < hubs:
+            return []
+        return [str(rng.randint(1, hubs))]
+    count = min(idx, rng.choice([0, 1, 1, 2, 2, 3]))
+    return [str(dep + 1) for dep in rng.sample(range(idx), count)]
+
+
+def generate_tasks(
+    size: int,
+    shape: str = 'random_dag',
+    seed: int = 0,
+    start_date: Optional[date] = None
+) -> List[Dict]:
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape '{shape}', expected one of: {', '.join(SHAPES)}")
+    if start_date is None:
+        start_date = date.today()
+
+    rng = random.Random(f'{seed}:{shape}:{size}')
+    hubs = max(1, size // 1000)
+    tasks = []
+    for idx in range(size):
+        tasks.append({
+            'id': str(idx + 1),
+            'title': f'{rng.choice(TITLE_VERBS)} {rng.choice(TITLE_NOUNS)} #{idx + 1}',
+            'due_date': random_due_date(rng, start_date),
+            'estimated_hours': rng.choice([0.5, 1, 2, 3, 4, 6, 8, 12, 16, 24]),
+            'importance': rng.randint(1, 10),
+            'dependencies': random_dependencies(rng, shape, idx, hubs)
+        })
+    return tasks
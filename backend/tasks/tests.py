@@ -1,20 +1,68 @@
-from django.test import TestCase
+import gzip
+import importlib
+import json
+import os
+import random
+import tempfile
+from array import array
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, clear_url_caches, resolve
 from django.utils import timezone
-from datetime import date, timedelta
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import Task
+from .models import DEFAULT_PROJECT_ID, Project, Task, TaskTombstone, bump_revision
+from .admin import TaskAdmin
+from .rescoring import annotate_live_scores, dependency_problems
 from .scoring import (
     calculate_urgency_score,
     calculate_importance_score,
     calculate_effort_score,
     calculate_dependency_score,
     calculate_priority_score,
+    count_blocked_tasks,
     detect_circular_dependencies,
+    explain_index,
     get_strategy_weights,
-    get_score_explanation
+    get_score_explanation,
+    ranked_indices,
+    score_components,
+    score_table,
+    table_components
 )
+from .synthetic import SHAPES, generate_tasks
+from .records import TaskRecord, TaskTable
+from .graph import GraphCycleError, TaskGraph
+from .scheduling import build_schedule
+from .forecast import URGENCY_BREAKPOINTS, build_forecast
+from .overhead import measure_profile
+from .loadtest import compare_runs, parse_mix, percentile, run_load_test, summarize
+from .transfer import export_tasks, import_tasks
+from .batch import scan_json_array
+from .sync import decode_token, encode_token
+from .reachability import get_index, invalidate_index
+from .ordering import DependencyCycleError, DependencyOrder, current_order, get_order, invalidate_order
+from .serializers import TaskTableSerializer
+from .benchmarks import compare_results, load_tasks_into_db, run_benchmarks
+from .instrumentation import Histogram, MetricsRegistry, phase
+from .middleware import CompressionMiddleware, QueryCountMiddleware, choose_encoding
+from .views import LIST_FIELDS
+from .queries import QueryBudgetExceeded, get_query_budget, query_budget
+from . import admin as admin_module
+from . import middleware as middleware_module
+from . import ordering as ordering_module
+from . import profiling as profiling_module
+from . import search as search_module
+from . import urls as task_urls
+from task_analyzer import urls as project_urls
 
 class TaskModelTest(TestCase):
     def setUp(self):
@@ -221,6 +269,7 @@ class ScoringTest(TestCase):
         self.assertIsInstance(explanation, str)
         self.assertGreater(len(explanation), 0)
 
+@override_settings(TASKS_QUERY_BUDGET_STRICT=True)
 class APITest(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -365,3 +414,1438 @@ class APITest(TestCase):
     def test_get_nonexistent_task(self):
         response = self.client.get('/api/tasks/99999/')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class SyntheticBenchmarkTest(TestCase):
+    def test_generate_tasks_is_seeded(self):
+        first = generate_tasks(50, shape='random_dag', seed=7)
+        second = generate_tasks(50, shape='random_dag', seed=7)
+        other = generate_tasks(50, shape='random_dag', seed=8)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_generated_shapes_are_acyclic_and_valid(self):
+        for shape in SHAPES:
+            tasks = generate_tasks(200, shape=shape, seed=1)
+            self.assertEqual(len(tasks), 200)
+            self.assertEqual(detect_circular_dependencies(tasks), [])
+            ids = {task['id'] for task in tasks}
+            for task in tasks:
+                self.assertTrue(set(task['dependencies']) <= ids)
+
+    def test_chain_shape_links_consecutive_tasks(self):
+        tasks = generate_tasks(5, shape='chain', seed=1)
+        self.assertEqual([task['dependencies'] for task in tasks], [[], ['1'], ['2'], ['3'], ['4']])
+
+    def test_generate_tasks_unknown_shape(self):
+        with self.assertRaises(ValueError):
+            generate_tasks(10, shape='spiral')
+
+    def test_run_benchmarks_reports_each_case(self):
+        report = run_benchmarks(sizes=[20], shapes=['chain'],
+                                benchmarks=['priority_score', 'detect_cycles', 'serialize', 'analyze_view'],
+                                repeat=1)
+        self.assertEqual(set(report['results']), {
+            'priority_score:chain:20', 'detect_cycles:chain:20', 'serialize:chain:20', 'analyze_view:chain:20'
+        })
+        self.assertGreater(report['results']['detect_cycles:chain:20']['seconds'], 0)
+
+    def test_compare_results_flags_regressions(self):
+        baseline = {'results': {'a:chain:10': {'seconds': 1.0}, 'b:chain:10': {'seconds': 1.0}}}
+        current = {'results': {'a:chain:10': {'seconds': 1.1}, 'b:chain:10': {'seconds': 1.5},
+                               'c:chain:10': {'seconds': 2.0}}}
+        comparisons = {item['key']: item for item in compare_results(baseline, current, threshold=0.2)}
+        self.assertFalse(comparisons['a:chain:10']['regression'])
+        self.assertTrue(comparisons['b:chain:10']['regression'])
+        self.assertNotIn('c:chain:10', comparisons)
+
+    def test_loading_refuses_a_real_database(self):
+        Task.objects.create(title='Keep me')
+        with mock.patch.dict(connection.settings_dict, {'NAME': '/srv/tasks/db.sqlite3'}):
+            with self.assertRaisesMessage(RuntimeError, 'only loaded into a test database'):
+                load_tasks_into_db(generate_tasks(5, seed=1))
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Keep me'])
+        load_tasks_into_db(generate_tasks(5, seed=1))
+        self.assertEqual(Task.objects.count(), 5)
+
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tasks_data = [
+            {'id': '1', 'title': 'Task 1', 'estimated_hours': 1, 'importance': 5, 'dependencies': []},
+            {'id': '2', 'title': 'Task 2', 'estimated_hours': 3, 'importance': 7, 'dependencies': ['1']}
+        ]
+
+    def test_analyze_returns_server_timing_phases(self):
+        response = self.client.post('/api/tasks/analyze/', self.tasks_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header = response['Server-Timing']
+        for name in ('validate', 'cycles', 'score', 'sort', 'render', 'total'):
+            self.assertIn(f'{name};dur=', header)
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.post('/api/tasks/analyze/', self.tasks_data, format='json')
+        response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE tasks_http_requests_total counter', body)
+        self.assertIn('tasks_http_requests_total{method="POST",status="200",view="analyze-tasks"}', body)
+        self.assertIn('tasks_phase_duration_seconds_bucket{phase="score",view="analyze-tasks",le="+Inf"}', body)
+        self.assertIn('tasks_processed_tasks_count{view="analyze-tasks"}', body)
+
+    def test_metrics_access_is_configurable(self):
+        with override_settings(TASKS_METRICS_PUBLIC=False, TASKS_METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/api/metrics').status_code, status.HTTP_404_NOT_FOUND)
+        with override_settings(TASKS_METRICS_PUBLIC=True, TASKS_METRICS_TOKEN='scrape'):
+            response = self.client.get('/api/metrics')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+            response = self.client.get('/api/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.client.get('/api/metrics', HTTP_AUTHORIZATION='Bearer scrape')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('tasks_http_requests_total', response.content.decode())
+
+    def test_disabled_instrumentation_skips_header(self):
+        with override_settings(TASKS_INSTRUMENTATION=False):
+            response = APIClient().post('/api/tasks/analyze/', self.tasks_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_phase_outside_request_is_noop(self):
+        with phase('score') as timer:
+            pass
+        self.assertFalse(hasattr(timer, 'recorder'))
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('sample_seconds', 'Sample.', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+        text = registry.render()
+        self.assertIn('sample_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('sample_seconds_bucket{le="1"} 2', text)
+        self.assertIn('sample_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('sample_seconds_count 3', text)
+        self.assertIsInstance(histogram, Histogram)
+
+@override_settings(TASKS_QUERY_BUDGET_STRICT=True)
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for idx in range(10):
+            Task.objects.create(title=f'Task {idx}', estimated_hours=idx, importance=5, dependencies=[])
+        self.task = Task.objects.first()
+
+    def test_every_endpoint_declares_a_budget(self):
+        for pattern in task_urls.urlpatterns:
+            self.assertIsNotNone(get_query_budget(pattern.callback), pattern.name)
+
+    def test_endpoints_stay_within_budget(self):
+        requests = [
+            lambda: self.client.get('/api/tasks/'),
+            lambda: self.client.post('/api/tasks/', {'title': 'New'}, format='json'),
+            lambda: self.client.get(f'/api/tasks/{self.task.id}/'),
+            lambda: self.client.put(f'/api/tasks/{self.task.id}/', {'title': 'Renamed'}, format='json'),
+            lambda: self.client.get('/api/tasks/suggest/'),
+            lambda: self.client.post('/api/tasks/analyze/', [{'title': 'Payload'}], format='json'),
+            lambda: self.client.get('/api/metrics'),
+            lambda: self.client.get('/api/tasks/schedule/'),
+            lambda: self.client.get('/api/tasks/forecast/'),
+            lambda: self.client.get('/api/tasks/search/', {'q': 'task'}),
+            lambda: self.client.get('/api/tasks/changes/'),
+            lambda: self.client.get(f'/api/tasks/{self.task.id}/descendants/'),
+            lambda: self.client.get('/api/projects/'),
+            lambda: self.client.post('/api/projects/', {'name': 'Budget'}, format='json'),
+            lambda: self.client.get(f'/api/projects/{DEFAULT_PROJECT_ID}/tasks/suggest/'),
+            lambda: self.client.post(f'/api/projects/{DEFAULT_PROJECT_ID}/tasks/', {'title': 'Nested'}, format='json'),
+            lambda: self.client.delete(f'/api/tasks/{self.task.id}/'),
+        ]
+        for make_request in requests:
+            response = make_request()
+            self.assertLess(response.status_code, 400)
+
+    def test_list_query_count_does_not_grow_with_rows(self):
+        with self.assertNumQueries(1):
+            self.client.get('/api/tasks/')
+        Task.objects.bulk_create(Task(title=f'Extra {idx}') for idx in range(50))
+        with self.assertNumQueries(1):
+            self.client.get('/api/tasks/')
+
+    def test_over_budget_raises_in_strict_mode(self):
+        @query_budget(0)
+        def chatty_view(request):
+            list(Task.objects.all())
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/chatty/')
+        middleware = QueryCountMiddleware(lambda req: middleware.process_view(req, chatty_view, (), {}) or chatty_view(req))
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(request)
+
+    @override_settings(TASKS_QUERY_BUDGET_STRICT=False)
+    def test_over_budget_logs_warning_when_not_strict(self):
+        @query_budget(0)
+        def chatty_view(request):
+            list(Task.objects.all())
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/chatty/')
+        middleware = QueryCountMiddleware(lambda req: middleware.process_view(req, chatty_view, (), {}) or chatty_view(req))
+        with self.assertLogs('tasks.queries', level='WARNING'):
+            response = middleware(request)
+        self.assertEqual(response.status_code, 200)
+
+class TaskTableTest(TestCase):
+    def test_record_round_trip(self):
+        task = {'id': 7, 'title': 'Task', 'due_date': '2025-12-01', 'estimated_hours': 2.5,
+                'importance': 8, 'dependencies': [1, '2']}
+        record = TaskRecord.from_dict(task)
+        self.assertEqual(record.to_dict(), {
+            'id': '7', 'title': 'Task', 'due_date': '2025-12-01', 'estimated_hours': 2.5,
+            'importance': 8, 'dependencies': ['1', '2']
+        })
+        self.assertEqual(record.get('dependencies'), ['1', '2'])
+        self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_table_round_trip_and_default_ids(self):
+        tasks = [
+            {'title': 'First', 'due_date': None, 'estimated_hours': 1, 'importance': 5, 'dependencies': []},
+            {'id': 'b', 'title': 'Second', 'due_date': '2025-12-01', 'estimated_hours': 3,
+             'importance': 7, 'dependencies': ['1']}
+        ]
+        table = TaskTable.from_dicts(tasks)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.ids, ['1', 'b'])
+        self.assertEqual(table.to_dicts()[1], {
+            'id': 'b', 'title': 'Second', 'due_date': '2025-12-01', 'estimated_hours': 3.0,
+            'importance': 7, 'dependencies': ['1']
+        })
+        self.assertIs(table.dependencies[1][0], table.ids[0])
+
+    def test_table_scores_match_dict_scoring(self):
+        tasks = generate_tasks(300, shape='random_dag', seed=5)
+        tasks[3]['dependencies'].append(tasks[3]['id'])
+        weights = get_strategy_weights('high_impact')
+        components = table_components(TaskTable.from_dicts(tasks))
+        scores = score_components(components, weights)
+        for idx, task in enumerate(tasks):
+            self.assertEqual(scores[idx], calculate_priority_score(task, tasks, weights))
+            self.assertEqual(explain_index(components, idx), get_score_explanation(task, tasks, weights))
+
+    def test_ranked_indices_is_stable(self):
+        scores = array('d', [0.5, 0.9, 0.5, 0.7])
+        self.assertEqual(ranked_indices(scores), [1, 3, 0, 2])
+        self.assertEqual(ranked_indices(scores, limit=3), [1, 3, 0])
+
+    def test_table_serializer_produces_table(self):
+        serializer = TaskTableSerializer(data=[{'title': 'A'}, {'title': 'B', 'dependencies': ['1']}])
+        self.assertTrue(serializer.is_valid())
+        table = serializer.validated_data
+        self.assertIsInstance(table, TaskTable)
+        self.assertEqual(table.ids, ['1', '2'])
+        self.assertEqual(table.importance.tolist(), [5, 5])
+
+    def test_table_serializer_reports_item_errors(self):
+        serializer = TaskTableSerializer(data=[{'title': 'A'}, {'title': 'B', 'importance': 11}])
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors[0], {})
+        self.assertIn('importance', serializer.errors[1])
+
+class TaskGraphTest(TestCase):
+    def build(self, tasks):
+        return TaskGraph.from_dicts(tasks)
+
+    def test_ids_are_interned_to_dense_nodes(self):
+        graph = self.build([
+            {'id': 'a', 'dependencies': []},
+            {'id': 'b', 'dependencies': ['a', 'missing']},
+            {'id': 'c', 'dependencies': ['a', 'b']},
+        ])
+        self.assertEqual(graph.ids, ['a', 'b', 'c', 'missing'])
+        self.assertEqual(graph.task_count, 3)
+        self.assertEqual(graph.edge_count, 4)
+        self.assertEqual(graph.dependencies_of(2).tolist(), [0, 1])
+        self.assertEqual(sorted(graph.dependents_of(0).tolist()), [1, 2])
+        self.assertEqual(graph.dependents_of(3).tolist(), [1])
+
+    def test_dependent_counts_match_count_blocked_tasks(self):
+        tasks = [
+            {'id': '1', 'dependencies': []},
+            {'id': '2', 'dependencies': ['1', '1']},
+            {'id': '3', 'dependencies': ['1', '3']},
+            {'id': '4', 'dependencies': [2, '1']},
+        ]
+        counts = self.build(tasks).row_dependent_counts()
+        self.assertEqual(counts, [count_blocked_tasks(task['id'], tasks) for task in tasks])
+        self.assertEqual(counts, [3, 1, 0, 0])
+
+    def test_duplicate_ids_keep_last_dependencies(self):
+        tasks = [
+            {'id': '1', 'dependencies': ['2']},
+            {'id': '2', 'dependencies': []},
+            {'id': '1', 'dependencies': []},
+        ]
+        self.assertEqual(detect_circular_dependencies(tasks), [])
+        self.assertEqual(self.build(tasks).row_dependent_counts(), [0, 1, 0])
+
+    def test_find_cycles_reports_path(self):
+        tasks = [
+            {'id': '1', 'dependencies': ['2']},
+            {'id': '2', 'dependencies': ['3']},
+            {'id': '3', 'dependencies': ['1']},
+            {'id': '4', 'dependencies': ['4']},
+        ]
+        self.assertEqual(self.build(tasks).find_cycles(), [['1', '2', '3', '1'], ['4', '4']])
+
+    def test_long_chain_does_not_recurse(self):
+        tasks = [{'id': str(idx), 'dependencies': [str(idx + 1)]} for idx in range(5000)]
+        self.assertEqual(detect_circular_dependencies(tasks), [])
+        tasks[-1]['dependencies'] = ['0']
+        self.assertEqual(len(detect_circular_dependencies(tasks)[0]), 5001)
+
+    def test_topological_order_puts_dependencies_first(self):
+        tasks = generate_tasks(200, shape='random_dag', seed=3)
+        graph = self.build(tasks)
+        position = {node: idx for idx, node in enumerate(graph.topological_order())}
+        for node in range(len(graph)):
+            for dep in graph.dependencies_of(node):
+                self.assertLess(position[dep], position[node])
+
+    def test_topological_order_rejects_cycles(self):
+        graph = self.build([{'id': '1', 'dependencies': ['2']}, {'id': '2', 'dependencies': ['1']}])
+        with self.assertRaises(GraphCycleError):
+            graph.topological_order()
+
+
+class SchedulingTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.start = date(2030, 1, 7)
+
+    def schedule(self, table, capacity=8, scores=None):
+        if scores is None:
+            scores = score_table(table, get_strategy_weights('smart_balance'), current_date=self.start)
+        return build_schedule(table, scores, capacity, self.start)
+
+    def test_dependencies_are_scheduled_first(self):
+        tasks = generate_tasks(300, shape='random_dag', seed=5)
+        table = TaskTable.from_dicts(tasks)
+        finished = {}
+        for day_number, day in enumerate(self.schedule(table)):
+            self.assertLessEqual(day['hours'], 8 + 1e-6)
+            for item in day['tasks']:
+                if item['completes']:
+                    finished[item['id']] = day_number
+        self.assertEqual(len(finished), len(table))
+        position = {task_id: idx for idx, task_id in enumerate(finished)}
+        for task in tasks:
+            for dep in task['dependencies']:
+                self.assertLess(position[str(dep)], position[task['id']])
+
+    def test_long_tasks_are_split_across_days(self):
+        table = TaskTable.from_dicts([
+            {'id': '1', 'title': 'Big', 'estimated_hours': 10, 'importance': 5, 'dependencies': []},
+            {'id': '2', 'title': 'Small', 'estimated_hours': 3, 'importance': 5, 'dependencies': ['1']},
+        ])
+        days = self.schedule(table, scores=array('d', [1.0, 1.0]))
+        self.assertEqual([day['date'] for day in days], ['2030-01-07', '2030-01-08'])
+        self.assertEqual([(item['id'], item['hours'], item['completes']) for item in days[0]['tasks']],
+                         [('1', 8.0, False)])
+        self.assertEqual([(item['id'], item['hours'], item['completes']) for item in days[1]['tasks']],
+                         [('1', 2.0, True), ('2', 3.0, True)])
+        self.assertEqual(days[1]['hours'], 5.0)
+
+    def test_highest_score_is_picked_first(self):
+        table = TaskTable.from_dicts([
+            {'id': 'a', 'title': 'Low', 'estimated_hours': 1, 'importance': 1, 'dependencies': []},
+            {'id': 'b', 'title': 'High', 'estimated_hours': 1, 'importance': 10, 'dependencies': []},
+            {'id': 'c', 'title': 'Blocked', 'estimated_hours': 1, 'importance': 10, 'dependencies': ['a']},
+        ])
+        days = self.schedule(table, scores=array('d', [1.0, 9.0, 10.0]))
+        self.assertEqual([item['id'] for item in days[0]['tasks']], ['b', 'a', 'c'])
+
+    def test_dangling_dependencies_do_not_block(self):
+        table = TaskTable.from_dicts([
+            {'id': '1', 'title': 'Task', 'estimated_hours': 2, 'importance': 5, 'dependencies': ['99']},
+        ])
+        self.assertEqual([item['id'] for item in self.schedule(table)[0]['tasks']], ['1'])
+
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.schedule(TaskTable(), capacity=0)
+
+    def test_schedule_endpoint_with_posted_tasks(self):
+        tasks = [
+            {'id': '1', 'title': 'Design', 'due_date': '2030-01-10', 'estimated_hours': 6,
+             'importance': 8, 'dependencies': []},
+            {'id': '2', 'title': 'Build', 'due_date': '2030-01-12', 'estimated_hours': 6,
+             'importance': 9, 'dependencies': ['1']},
+        ]
+        response = self.client.post('/api/tasks/schedule/?capacity=4&start_date=2030-01-07', tasks, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_days'], 3)
+        self.assertEqual(response.data['end_date'], '2030-01-09')
+        self.assertEqual(response.data['total_hours'], 12.0)
+        self.assertEqual(response.data['days'][0]['tasks'][0]['id'], '1')
+
+    def test_schedule_endpoint_rejects_bad_input(self):
+        task = {'title': 'Task', 'estimated_hours': 1, 'importance': 5, 'dependencies': []}
+        for query in ('capacity=0', 'capacity=abc', 'capacity=30', 'start_date=tomorrow'):
+            response = self.client.post(f'/api/tasks/schedule/?{query}', [task], format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+        cyclic = [dict(task, id='1', dependencies=['2']), dict(task, id='2', dependencies=['1'])]
+        response = self.client.post('/api/tasks/schedule/', cyclic, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cycles', response.data)
+
+        duplicated = [dict(task, id='1'), dict(task, id='1')]
+        response = self.client.post('/api/tasks/schedule/', duplicated, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_schedule_endpoint_uses_stored_tasks(self):
+        first = Task.objects.create(title='First', estimated_hours=3, importance=5)
+        Task.objects.create(title='Second', estimated_hours=3, importance=10, dependencies=[str(first.id)])
+        response = self.client.get('/api/tasks/schedule/?capacity=8&start_date=2030-01-07')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['title'] for item in response.data['days'][0]['tasks']], ['First', 'Second'])
+
+
+class SettingsProfileTest(TestCase):
+    def test_production_profile_is_lean(self):
+        result = measure_profile('task_analyzer.settings_production', runs=1, requests=3)
+        self.assertFalse(result['debug'])
+        self.assertEqual(result['installed_apps'], 3)
+        self.assertEqual(result['middleware'], 6)
+        self.assertGreater(result['first_request_seconds'], 0)
+        self.assertIn('middleware_overhead_seconds', result)
+
+    def test_admin_is_optional(self):
+        self.assertEqual(resolve('/admin/').app_name, 'admin')
+        try:
+            with override_settings(INSTALLED_APPS=['rest_framework', 'corsheaders', 'tasks']):
+                importlib.reload(project_urls)
+                clear_url_caches()
+                with self.assertRaises(Resolver404):
+                    resolve('/admin/')
+                self.assertEqual(resolve('/api/tasks/analyze/').url_name, 'analyze-tasks')
+        finally:
+            importlib.reload(project_urls)
+            clear_url_caches()
+
+
+class TransferCommandTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def create_tasks(self):
+        first = Task.objects.create(title='First', due_date=date(2030, 1, 1), estimated_hours=2, importance=7)
+        second = Task.objects.create(title='Second, with comma', estimated_hours=1.5, importance=3,
+                                     dependencies=[str(first.id)])
+        Task.objects.create(title='Third', dependencies=[str(first.id), str(second.id), '999'])
+
+    def snapshot(self):
+        tasks = list(Task.objects.order_by('id'))
+        position = {str(task.id): idx for idx, task in enumerate(tasks)}
+        return [
+            (task.title, task.due_date, task.estimated_hours, task.importance,
+             [position.get(str(dep), dep) for dep in task.dependencies])
+            for task in tasks
+        ]
+
+    def round_trip(self, name):
+        self.create_tasks()
+        expected = self.snapshot()
+        # The dependency on a task outside the file is dropped.
+        expected[2] = expected[2][:4] + ([0, 1],)
+        call_command('export_tasks', self.path(name), stderr=StringIO())
+        out = StringIO()
+        call_command('import_tasks', self.path(name), '--clear', '--batch-size', '2', stdout=out, stderr=StringIO())
+        self.assertEqual(self.snapshot(), expected)
+        self.assertIn('Imported 3 tasks', out.getvalue())
+        self.assertIn('1 unresolved dropped', out.getvalue())
+
+    def test_ndjson_round_trip(self):
+        self.round_trip('tasks.ndjson')
+        with open(self.path('tasks.ndjson')) as fh:
+            self.assertEqual(len(fh.readlines()), 3)
+
+    def test_csv_round_trip(self):
+        self.round_trip('tasks.csv')
+
+    def test_forward_references_are_remapped(self):
+        with open(self.path('forward.ndjson'), 'w') as fh:
+            fh.write(json.dumps({'id': '10', 'title': 'Later', 'dependencies': ['20']}) + '\n')
+            fh.write(json.dumps({'id': '20', 'title': 'Earlier', 'dependencies': []}) + '\n')
+        call_command('import_tasks', self.path('forward.ndjson'), stdout=StringIO(), stderr=StringIO())
+        later = Task.objects.get(title='Later')
+        earlier = Task.objects.get(title='Earlier')
+        self.assertEqual(later.dependencies, [str(earlier.id)])
+
+    def test_invalid_row_imports_nothing(self):
+        with open(self.path('bad.ndjson'), 'w') as fh:
+            fh.write(json.dumps({'id': '1', 'title': 'Fine'}) + '\n')
+            fh.write(json.dumps({'id': '2', 'title': 'Bad', 'importance': 11}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'Line 2'):
+            call_command('import_tasks', self.path('bad.ndjson'), stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_cyclic_import_imports_nothing(self):
+        with open(self.path('cycle.ndjson'), 'w') as fh:
+            fh.write(json.dumps({'id': 'a', 'title': 'A', 'dependencies': ['c']}) + '\n')
+            fh.write(json.dumps({'id': 'b', 'title': 'B', 'dependencies': ['a']}) + '\n')
+            fh.write(json.dumps({'id': 'c', 'title': 'C', 'dependencies': ['b']}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'Dependencies form a cycle: a -> c -> b -> a'):
+            call_command('import_tasks', self.path('cycle.ndjson'), stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_unresolved_ids_never_match_stored_tasks(self):
+        existing = Task.objects.create(title='Unrelated')
+        with open(self.path('dangling.ndjson'), 'w') as fh:
+            fh.write(json.dumps({'id': '50', 'title': 'Imported', 'dependencies': [str(existing.id)]}) + '\n')
+        order = get_order(DEFAULT_PROJECT_ID)
+        call_command('import_tasks', self.path('dangling.ndjson'), stdout=StringIO(), stderr=StringIO())
+        imported = Task.objects.get(title='Imported')
+        self.assertEqual(imported.dependencies, [])
+        # The import bumps the revision, so the cached order is reloaded.
+        self.assertIsNot(get_order(DEFAULT_PROJECT_ID), order)
+        self.assertIn(str(imported.id), get_order(DEFAULT_PROJECT_ID))
+
+    def test_export_streams_in_chunks(self):
+        Task.objects.bulk_create(Task(title=f'Task {idx}') for idx in range(25))
+        out = StringIO()
+        with self.assertNumQueries(1):
+            total = export_tasks(out, 'ndjson', chunk_size=10)
+        self.assertEqual(total, 25)
+        self.assertEqual(len(out.getvalue().splitlines()), 25)
+
+
+class AnalyzeFileTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tasks = generate_tasks(60, shape='random_dag', seed=9)
+        self.tasks[0]['title'] = 'Ünïcode  '
+
+    def write(self, name, tasks, as_array):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as fh:
+            if as_array:
+                json.dump(tasks, fh, indent=2, ensure_ascii=False)
+            else:
+                fh.writelines(json.dumps(task, ensure_ascii=False) + '\n' for task in tasks)
+        return path
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('analyze_file', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_matches_analyze_endpoint(self):
+        expected = APIClient().post('/api/tasks/analyze/?strategy=high_impact', self.tasks, format='json')
+        expected = json.loads(expected.content)
+        for name, as_array in (('tasks.ndjson', False), ('tasks.json', True)):
+            path = self.write(name, self.tasks, as_array)
+            lines = self.run_command(path, '--strategy', 'high_impact').splitlines()
+            self.assertEqual([json.loads(line) for line in lines], expected['tasks'], name)
+            document = json.loads(self.run_command(path, '--strategy', 'high_impact', '--output-format', 'json'))
+            self.assertEqual(document, expected)
+
+    def test_top_k(self):
+        path = self.write('tasks.ndjson', self.tasks, False)
+        full = [json.loads(line) for line in self.run_command(path).splitlines()]
+        top = [json.loads(line) for line in self.run_command(path, '--top', '5').splitlines()]
+        self.assertEqual(top, full[:5])
+
+    def test_scan_reports_byte_ranges(self):
+        path = self.write('tasks.json', self.tasks, True)
+        with open(path, 'rb') as fh:
+            data = fh.read()
+            fh.seek(0)
+            for (offset, length, value), task in zip(scan_json_array(fh), self.tasks):
+                self.assertEqual(value, task)
+                self.assertEqual(json.loads(data[offset:offset + length]), task)
+
+    def test_invalid_tasks_and_cycles_fail(self):
+        bad = self.write('bad.ndjson', [{'title': 'Fine'}, {'title': 'Bad', 'importance': 0}], False)
+        with self.assertRaisesMessage(CommandError, '1 invalid task(s)'):
+            self.run_command(bad)
+        cyclic = self.write('cyclic.ndjson', [
+            {'id': '1', 'title': 'A', 'dependencies': ['2']},
+            {'id': '2', 'title': 'B', 'dependencies': ['1']},
+        ], False)
+        with self.assertRaisesMessage(CommandError, 'Circular dependencies detected'):
+            self.run_command(cyclic)
+
+
+@override_settings(TASKS_QUERY_BUDGET_STRICT=True)
+@override_settings(TASKS_SYNC_SETTLE_SECONDS=0)
+class TaskChangesTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def changes(self, token=None, **params):
+        if token:
+            params['since'] = token
+        response = self.client.get('/api/tasks/changes/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        TaskTombstone.objects.create(task_id=99)
+        first = Task.objects.create(title='First')
+        second = Task.objects.create(title='Second')
+        data = self.changes()
+        self.assertEqual([task['id'] for task in data['tasks']], [str(first.id), str(second.id)])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_returns_only_changes_and_tombstones(self):
+        kept = Task.objects.create(title='Kept')
+        edited = Task.objects.create(title='Edited')
+        removed = Task.objects.create(title='Removed')
+        token = self.changes()['token']
+        self.assertEqual(self.changes(token)['tasks'], [])
+
+        self.client.put(f'/api/tasks/{edited.id}/', {'title': 'Edited again'}, format='json')
+        self.client.delete(f'/api/tasks/{removed.id}/')
+        created = Task.objects.create(title='Created')
+        data = self.changes(token)
+        self.assertEqual([task['id'] for task in data['tasks']], [str(edited.id), str(created.id)])
+        self.assertEqual(data['tasks'][0]['title'], 'Edited again')
+        self.assertEqual(data['deleted'], [str(removed.id)])
+        self.assertNotIn(str(kept.id), [task['id'] for task in data['tasks']])
+
+        data = self.changes(data['token'])
+        self.assertEqual((data['tasks'], data['deleted']), ([], []))
+
+    def test_paging_through_equal_timestamps(self):
+        Task.objects.bulk_create(Task(title=f'Task {idx}') for idx in range(7))
+        Task.objects.update(updated_at=timezone.now())
+        seen = []
+        data = {'has_more': True, 'token': None}
+        while data['has_more']:
+            data = self.changes(data['token'], limit=3)
+            seen.extend(task['id'] for task in data['tasks'])
+        self.assertEqual(seen, [str(pk) for pk in Task.objects.order_by('id').values_list('id', flat=True)])
+
+    def test_bad_and_expired_tokens(self):
+        response = self.client.get('/api/tasks/changes/', {'since': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/tasks/changes/', {'limit': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        stale = timezone.now() - timedelta(days=31)
+        response = self.client.get('/api/tasks/changes/', {'since': encode_token(stale, None, (stale, 0), (stale, 0))})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertTrue(response.data['resync'])
+        response = self.client.get('/api/tasks/changes/', {'since': '1-2-3-4'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_round_trip(self):
+        moment = timezone.now()
+        earlier = moment - timedelta(seconds=3)
+        self.assertEqual(decode_token(encode_token(moment, earlier, (earlier, 5), (moment, 7))),
+                         (moment, earlier, (earlier, 5), (moment, 7)))
+        self.assertIsNone(decode_token(encode_token(moment, None, (earlier, 5), (moment, 7)))[1])
+
+    def test_tombstones_share_the_page_limit(self):
+        token = self.changes()['token']
+        Task.objects.create(title='Kept')
+        tasks = Task.objects.bulk_create(Task(title=f'Task {idx}') for idx in range(5))
+        for task in tasks:
+            self.client.delete(f'/api/tasks/{task.id}/')
+        seen, deleted = [], []
+        data = {'has_more': True, 'token': token}
+        while data['has_more']:
+            data = self.changes(data['token'], limit=2)
+            self.assertLessEqual(len(data['tasks']) + len(data['deleted']), 2)
+            seen.extend(task['title'] for task in data['tasks'])
+            deleted.extend(data['deleted'])
+        self.assertEqual(seen, ['Kept'])
+        self.assertEqual(deleted, [str(task.id) for task in tasks])
+
+    def test_queryset_delete_writes_tombstones_in_bulk(self):
+        token = self.changes()['token']
+        kept = Task.objects.create(title='Kept')
+        tasks = Task.objects.bulk_create(Task(title=f'Task {idx}') for idx in range(20))
+        with CaptureQueriesContext(connection) as queries:
+            Task.objects.exclude(pk=kept.pk).delete()
+        # One select, one tombstone insert, one delete and the revision bump,
+        # however many rows.
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual([verb for verb in statements if verb not in ('SAVEPOINT', 'RELEASE')],
+                         ['SELECT', 'INSERT', 'DELETE', 'UPDATE'])
+        data = self.changes(token)
+        self.assertEqual([task['title'] for task in data['tasks']], ['Kept'])
+        self.assertEqual(sorted(data['deleted'], key=int), [str(task.id) for task in tasks])
+
+    def test_import_is_restamped_when_it_commits(self):
+        old = Task.objects.create(title='Old')
+        rows = StringIO(json.dumps({'id': 'a', 'title': 'Imported'}) + '\n')
+        with self.captureOnCommitCallbacks() as callbacks:
+            import_tasks(rows, clear=True)
+            # A concurrent sync finishes before the import commits, so its
+            # cursor is already past the stamps the import's rows were given.
+            token = self.changes()['token']
+            data = self.changes(token)
+            self.assertEqual((data['tasks'], data['deleted']), ([], []))
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        data = self.changes(token)
+        self.assertEqual([task['title'] for task in data['tasks']], ['Imported'])
+        self.assertEqual(data['deleted'], [str(old.id)])
+
+    @override_settings(TASKS_SYNC_SETTLE_SECONDS=5)
+    def test_late_commits_are_delivered_by_the_settle_window(self):
+        first = Task.objects.create(title='First')
+        data = self.changes()
+        # Saved before the cursor was handed out but committed after it.
+        late = Task.objects.create(title='Late')
+        Task.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(microseconds=1))
+        data = self.changes(data['token'])
+        self.assertEqual([task['title'] for task in data['tasks']], ['Late', 'First'])
+        self.assertFalse(data['has_more'])
+
+    def test_prune_tombstones(self):
+        old = TaskTombstone.objects.create(task_id=1)
+        TaskTombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+        TaskTombstone.objects.create(task_id=2)
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 1 tombstone(s)', out.getvalue())
+        self.assertEqual(list(TaskTombstone.objects.values_list('task_id', flat=True)), [2])
+
+
+@override_settings(TASKS_QUERY_BUDGET_STRICT=True)
+class ReachabilityTest(TestCase):
+    def setUp(self):
+        invalidate_index()
+        self.addCleanup(invalidate_index)
+        self.client = APIClient()
+        # a <- b <- c <- d, and e depends on both a and d
+        self.a = Task.objects.create(title='A')
+        self.b = Task.objects.create(title='B', dependencies=[str(self.a.id)])
+        self.c = Task.objects.create(title='C', dependencies=[str(self.b.id), '999'])
+        self.d = Task.objects.create(title='D', dependencies=[str(self.c.id)])
+        self.e = Task.objects.create(title='E', dependencies=[str(self.a.id), str(self.d.id)])
+
+    def get(self, task, direction, **params):
+        response = self.client.get(f'/api/tasks/{task.id}/{direction}/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ancestors_with_depths(self):
+        data = self.get(self.e, 'ancestors')
+        self.assertEqual(data['count'], 4)
+        depths = {task['title']: task['depth'] for task in data['tasks']}
+        self.assertEqual(depths, {'A': 1, 'D': 1, 'C': 2, 'B': 3})
+
+    def test_descendants_and_depth_limit(self):
+        data = self.get(self.a, 'descendants')
+        self.assertEqual(sorted(task['title'] for task in data['tasks']), ['B', 'C', 'D', 'E'])
+        data = self.get(self.a, 'descendants', depth=1)
+        self.assertEqual(sorted(task['title'] for task in data['tasks']), ['B', 'E'])
+        data = self.get(self.a, 'descendants', depth=2, count_only='true')
+        self.assertEqual(data, {'task_id': str(self.a.id), 'direction': 'descendants', 'depth': 2, 'count': 3})
+
+    def test_index_is_cached_and_invalidated_by_edits(self):
+        self.get(self.a, 'descendants')
+        with self.assertNumQueries(1):
+            self.get(self.a, 'descendants')
+        Task.objects.create(title='F', dependencies=[str(self.e.id)])
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 5)
+        self.client.put(f'/api/tasks/{self.b.id}/', {'title': 'B', 'dependencies': []}, format='json')
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 2)
+        self.client.delete(f'/api/tasks/{self.e.id}/')
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 0)
+
+    def test_bulk_writes_invalidate_through_the_revision(self):
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 4)
+        Task.objects.filter(pk=self.b.pk).update(dependencies=[])
+        # update() skips Task.save, so the writer bumps the revision itself.
+        bump_revision(DEFAULT_PROJECT_ID)
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 1)
+        Task.objects.filter(pk__in=[self.d.pk, self.e.pk]).delete()
+        self.assertEqual(self.get(self.a, 'descendants')['count'], 0)
+
+    def test_stored_cycles_terminate(self):
+        Task.objects.filter(pk=self.a.pk).update(dependencies=[str(self.d.id)], updated_at=timezone.now())
+        self.assertEqual(self.get(self.a, 'ancestors')['count'], 3)
+
+    def test_errors(self):
+        response = self.client.get('/api/tasks/999999/ancestors/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f'/api/tasks/{self.a.id}/ancestors/', {'depth': '0'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DependencyOrderTest(TestCase):
+    def test_matches_full_cycle_detection(self):
+        rng = random.Random(11)
+        ids = [str(idx) for idx in range(40)]
+        order = DependencyOrder.from_rows((task_id, []) for task_id in ids)
+        edges = {task_id: [] for task_id in ids}
+        for _ in range(400):
+            task_id, dep = rng.sample(ids, 2)
+            if dep in edges[task_id]:
+                continue
+            candidate = [{'id': key, 'dependencies': deps + ([dep] if key == task_id else [])}
+                         for key, deps in edges.items()]
+            creates_cycle = bool(detect_circular_dependencies(candidate))
+            try:
+                order.set_dependencies(task_id, edges[task_id] + [dep])
+            except DependencyCycleError as error:
+                self.assertTrue(creates_cycle)
+                self.assertEqual(error.cycle[0], task_id)
+                self.assertEqual(error.cycle[-1], task_id)
+            else:
+                self.assertFalse(creates_cycle)
+                edges[task_id].append(dep)
+            self.assertTrue(order.is_consistent())
+            self.assertEqual({key: set(deps) for key, deps in edges.items()}, order.dependencies)
+
+    def test_rejected_update_keeps_previous_edges(self):
+        order = DependencyOrder.from_rows([('1', []), ('2', ['1']), ('3', ['2'])])
+        with self.assertRaises(DependencyCycleError) as ctx:
+            order.set_dependencies('1', ['3'])
+        self.assertEqual(ctx.exception.cycle, ['1', '3', '2', '1'])
+        order.set_dependencies('3', ['1'])
+        with self.assertRaises(DependencyCycleError):
+            order.set_dependencies('1', ['2'])
+        self.assertEqual(order.dependencies, {'1': set(), '2': {'1'}, '3': {'1'}})
+        self.assertTrue(order.is_consistent())
+
+    def test_stored_cycles_are_tolerated(self):
+        order = DependencyOrder.from_rows([('1', ['2']), ('2', ['1']), ('3', ['1', '404'])])
+        self.assertTrue(order.is_consistent())
+        order.set_dependencies('1', [])
+        order.set_dependencies('2', ['1'])
+        self.assertTrue(order.is_consistent())
+
+
+@override_settings(TASKS_QUERY_BUDGET_STRICT=True)
+class WriteValidationTest(TestCase):
+    def setUp(self):
+        invalidate_order()
+        self.addCleanup(invalidate_order)
+        self.client = APIClient()
+
+    def create(self, title, dependencies=()):
+        response = self.client.post('/api/tasks/', {'title': title, 'dependencies': list(dependencies)},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data['id']
+
+    def update(self, task_id, dependencies):
+        return self.client.put(f'/api/tasks/{task_id}/', {'title': 'Edited', 'dependencies': dependencies},
+                               format='json')
+
+    def test_rejects_unknown_dependencies(self):
+        response = self.client.post('/api/tasks/', {'title': 'Orphan', 'dependencies': ['12345']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['missing'], ['12345'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_rejects_cycles_on_update(self):
+        first = self.create('First')
+        second = self.create('Second', [first])
+        third = self.create('Third', [second])
+        response = self.update(first, [third])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['cycle'], [first, third, second, first])
+        self.assertEqual(Task.objects.get(pk=first).dependencies, [])
+        response = self.update(first, [first])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.update(third, [first]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.update(first, [second]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.update(second, []).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.update(first, [second]).status_code, status.HTTP_200_OK)
+
+    def test_writes_reuse_the_cached_order(self):
+        first = self.create('First')
+        second = self.create('Second')
+        # Lookup, locked revision read, write, revision bump and the re-read
+        # of the revision the order now matches, plus two savepoint pairs.
+        with self.assertNumQueries(9):
+            self.assertEqual(self.update(second, [first]).status_code, status.HTTP_200_OK)
+        self.client.delete(f'/api/tasks/{first}/')
+        with self.assertNumQueries(8):
+            self.create('Third', [second])
+        self.assertIn(second, current_order(DEFAULT_PROJECT_ID))
+
+    def test_rejected_create_rolls_back_the_row(self):
+        first = self.create('First')
+        with mock.patch.object(DependencyOrder, 'add_edge', side_effect=DependencyCycleError([first, first])):
+            response = self.client.post('/api/tasks/', {'title': 'Second', 'dependencies': [first]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cycle', response.data)
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['First'])
+        self.assertEqual(list(current_order(DEFAULT_PROJECT_ID).position), [first])
+
+    def test_writes_from_other_workers_are_checked_under_the_lock(self):
+        first = self.create('First')
+        second = self.create('Second')
+        # Another worker commits first -> second; its save bumps the revision.
+        task = Task.objects.get(pk=first)
+        task.dependencies = [second]
+        task.save()
+        with mock.patch.object(ordering_module, 'project_revision', wraps=ordering_module.project_revision) as revision:
+            response = self.update(second, [first])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['cycle'], [second, first, second])
+        self.assertEqual(revision.call_args_list[0], mock.call(DEFAULT_PROJECT_ID, lock=True))
+
+    def test_failed_save_drops_the_changed_order(self):
+        first = self.create('First')
+        second = self.create('Second')
+        with mock.patch.object(Task, 'save', side_effect=DatabaseError('disk full')):
+            response = self.update(second, [first])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIsNone(current_order(DEFAULT_PROJECT_ID))
+        self.assertEqual(get_order(DEFAULT_PROJECT_ID).dependencies[second], set())
+        self.assertEqual(self.update(first, [second]).status_code, status.HTTP_200_OK)
+
+    def test_delete_strips_the_task_from_its_dependents(self):
+        first = self.create('First')
+        second = self.create('Second', [first])
+        third = self.create('Third', [first, second])
+        # Stored before validation existed: an int id and a longer id that
+        # only shares a prefix with first.
+        legacy = Task.objects.create(title='Legacy', dependencies=[int(first), first + '0'])
+        before = Task.objects.get(pk=second).updated_at
+        token = self.client.get('/api/tasks/changes/').data['token']
+        self.assertEqual(self.client.delete(f'/api/tasks/{first}/').status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Task.objects.get(pk=second).dependencies, [])
+        self.assertEqual(Task.objects.get(pk=third).dependencies, [second])
+        self.assertEqual(Task.objects.get(pk=legacy.pk).dependencies, [first + '0'])
+        self.assertGreater(Task.objects.get(pk=second).updated_at, before)
+        self.assertEqual(get_order(DEFAULT_PROJECT_ID).dependencies[third], {second})
+        changed = self.client.get('/api/tasks/changes/', {'since': token}).data
+        self.assertEqual(changed['deleted'], [first])
+        self.assertLessEqual({second, third, str(legacy.pk)}, {task['id'] for task in changed['tasks']})
+
+    def test_reloads_after_external_writes(self):
+        first = self.create('First')
+        second = Task.objects.create(title='Second', dependencies=[first])
+        response = self.update(first, [str(second.id)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('cycle', response.data)
+
+
+class FieldSelectionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tasks = [
+            {'id': '1', 'title': 'Alpha', 'due_date': '2030-01-01', 'estimated_hours': 2, 'importance': 7,
+             'dependencies': []},
+            {'id': '2', 'title': 'Beta', 'estimated_hours': 1, 'importance': 9, 'dependencies': ['1']},
+        ]
+
+    def analyze(self, query):
+        return self.client.post(f'/api/tasks/analyze/?{query}', self.tasks, format='json')
+
+    def test_fields_select_and_order_keys(self):
+        response = self.analyze('fields=priority_score,id')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        full = self.analyze('').data['tasks']
+        self.assertEqual(response.data['tasks'],
+                         [{'id': task['id'], 'priority_score': task['priority_score']} for task in full])
+
+    def test_explain_false_skips_explanations(self):
+        with mock.patch('tasks.views.explain_index') as explain:
+            response = self.analyze('explain=false')
+            self.client.get('/api/tasks/suggest/?explain=false')
+        explain.assert_not_called()
+        self.assertNotIn('explanation', response.data['tasks'][0])
+        self.assertIn('title', response.data['tasks'][0])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.analyze('fields=id,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('secret', response.data['error'])
+
+    def test_list_and_suggest_fields(self):
+        Task.objects.create(title='Stored', importance=4)
+        response = self.client.get('/api/tasks/?fields=id,title,updated_at')
+        self.assertEqual(list(response.data[0]), ['id', 'title', 'updated_at'])
+        default = self.client.get('/api/tasks/').data[0]
+        self.assertEqual(list(default), list(LIST_FIELDS))
+        response = self.client.get('/api/tasks/suggest/?fields=title')
+        self.assertEqual(response.data['suggestions'], [{'title': 'Stored'}])
+
+
+class CompressionTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.tasks = generate_tasks(200, seed=4)
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.post('/api/tasks/analyze/', self.tasks, format='json')
+        response = self.client.post('/api/tasks/analyze/', self.tasks, format='json',
+                                    HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content) / 4)
+        self.assertEqual(json.loads(gzip.decompress(response.content)), json.loads(plain.content))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_small_responses_are_left_alone(self):
+        response = self.client.get('/api/tasks/suggest/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_html_responses_are_not_compressed(self):
+        admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        Task.objects.bulk_create([Task(title=f'Task {idx}') for idx in range(50)])
+        response = self.client.get('/admin/tasks/task/?q=Task', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertGreater(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        compress = CompressionMiddleware(lambda request: HttpResponse(b'<p>' * 1000, content_type='text/html'))
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(compress(request).has_header('Content-Encoding'))
+
+    def test_encoding_negotiation(self):
+        self.assertEqual(choose_encoding('gzip;q=0.5, br'), 'br' if middleware_module.brotli else 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertEqual(choose_encoding('*'), 'br' if middleware_module.brotli else 'gzip')
+        with mock.patch.object(middleware_module, 'brotli', None):
+            self.assertEqual(choose_encoding('br, gzip;q=0.1'), 'gzip')
+            self.assertIsNone(choose_encoding('br'))
+
+
+class ProjectPartitionTest(TestCase):
+    def setUp(self):
+        invalidate_index()
+        invalidate_order()
+        self.addCleanup(invalidate_index)
+        self.addCleanup(invalidate_order)
+        self.client = APIClient()
+        self.other = Project.objects.create(name='Other')
+        self.mine = Task.objects.create(title='Mine', importance=3)
+        self.theirs = Task.objects.create(project=self.other, title='Theirs', importance=9)
+
+    def url(self, path, project=None):
+        return f'/api/projects/{(project or self.other).id}/tasks/{path}'
+
+    def test_default_project_is_created_by_migration(self):
+        self.assertEqual(Project.objects.get(pk=DEFAULT_PROJECT_ID).name, 'Default')
+        self.assertEqual(self.mine.project_id, DEFAULT_PROJECT_ID)
+
+    def test_list_and_create_projects(self):
+        response = self.client.get('/api/projects/')
+        self.assertEqual([(p['name'], p['task_count']) for p in response.data], [('Default', 1), ('Other', 1)])
+        response = self.client.post('/api/projects/', {'name': 'Third'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['task_count'], 0)
+        response = self.client.post('/api/projects/', {'name': 'Third'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_endpoints_only_see_their_project(self):
+        response = self.client.get(self.url(''))
+        self.assertEqual([task['title'] for task in response.data], ['Theirs'])
+        response = self.client.get('/api/tasks/')
+        self.assertEqual([task['title'] for task in response.data], ['Mine'])
+        response = self.client.get('/api/tasks/suggest/')
+        self.assertEqual(response.data['total_available'], 1)
+        self.assertEqual(response.data['suggestions'][0]['title'], 'Mine')
+        self.assertEqual(self.client.get(self.url(f'{self.mine.id}/')).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(f'/api/tasks/{self.theirs.id}/').status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/projects/999/tasks/suggest/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_in_project(self):
+        response = self.client.post(self.url(''), {'title': 'New', 'dependencies': [str(self.theirs.id)]},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.get(pk=response.data['id']).project_id, self.other.id)
+        response = self.client.get(self.url(f'{self.theirs.id}/descendants/'))
+        self.assertEqual(response.data['count'], 1)
+
+    def test_dependencies_cannot_cross_projects(self):
+        response = self.client.post(self.url(''), {'title': 'New', 'dependencies': [str(self.mine.id)]},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['missing'], [str(self.mine.id)])
+        response = self.client.put(f'/api/tasks/{self.mine.id}/',
+                                   {'title': 'Mine', 'dependencies': [str(self.theirs.id)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_caches_are_per_project(self):
+        index = get_index(DEFAULT_PROJECT_ID)
+        Task.objects.create(project=self.other, title='Elsewhere')
+        self.assertIs(get_index(DEFAULT_PROJECT_ID), index)
+        Task.objects.create(title='Here')
+        self.assertIsNot(get_index(DEFAULT_PROJECT_ID), index)
+
+    def test_changes_are_per_project(self):
+        token = self.client.get('/api/tasks/changes/').data['token']
+        other_token = self.client.get(self.url('changes/')).data['token']
+        self.client.delete(self.url(f'{self.theirs.id}/'))
+        self.assertEqual(self.client.get('/api/tasks/changes/', {'since': token}).data['deleted'], [])
+        response = self.client.get(self.url('changes/'), {'since': other_token})
+        self.assertEqual(response.data['deleted'], [str(self.theirs.id)])
+
+    def test_import_into_project(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'tasks.ndjson')
+            with open(path, 'w') as fh:
+                fh.write(json.dumps({'id': '1', 'title': 'Imported'}) + '\n')
+            call_command('import_tasks', path, '--clear', '--project', str(self.other.id),
+                         stdout=StringIO(), stderr=StringIO())
+            with self.assertRaisesMessage(CommandError, 'does not exist'):
+                call_command('import_tasks', path, '--project', '999', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(list(self.other.tasks.values_list('title', flat=True)), ['Imported'])
+        self.assertTrue(Task.objects.filter(pk=self.mine.pk).exists())
+
+
+class ForecastTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.start = date(2030, 1, 1)
+
+    def test_breakpoints_come_from_the_urgency_buckets(self):
+        self.assertEqual(sorted(URGENCY_BREAKPOINTS), [0, 1, 3, 7, 14, 30])
+
+    def test_matches_rescoring_every_day(self):
+        for strategy in ('smart_balance', 'deadline_driven'):
+            table = TaskTable.from_dicts(generate_tasks(300, seed=7, start_date=self.start))
+            weights = get_strategy_weights(strategy)
+            days = build_forecast(table, weights, self.start, 60, 5)
+            expected = []
+            previous = None
+            for offset in range(60):
+                day = self.start + timedelta(days=offset)
+                scores = score_table(table, weights, current_date=day)
+                ranking = [table.ids[idx] for idx in ranked_indices(scores, limit=5)]
+                if ranking != previous:
+                    expected.append((day.isoformat(), ranking, [scores[table.ids.index(i)] for i in ranking]))
+                previous = ranking
+            actual = [(entry['date'], [task['id'] for task in entry['tasks']],
+                       [task['priority_score'] for task in entry['tasks']]) for entry in days]
+            self.assertEqual(actual, expected)
+            self.assertLess(len(days), 60)
+
+    def test_stored_tasks(self):
+        Task.objects.create(title='Later', due_date=self.start + timedelta(days=20), importance=5)
+        Task.objects.create(title='Important', importance=9)
+        response = self.client.get('/api/tasks/forecast/', {'start_date': '2030-01-01', 'horizon': 30, 'top': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['end_date'], '2030-01-30')
+        self.assertEqual([(day['date'], day['tasks'][0]['title']) for day in response.data['days']],
+                         [('2030-01-01', 'Important'), ('2030-01-18', 'Later')])
+
+    def test_payload_and_validation(self):
+        tasks = [{'id': '1', 'title': 'Soon', 'due_date': '2030-01-05'}, {'id': '2', 'title': 'Open'}]
+        response = self.client.post('/api/tasks/forecast/?start_date=2030-01-01&horizon=10', tasks, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_tasks'], 2)
+        for params in ({'horizon': '0'}, {'horizon': 'x'}, {'top': '100'}, {'start_date': '2030-13-01'}):
+            response = self.client.get('/api/tasks/forecast/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.report = Task.objects.create(title='Report')
+        self.long = Task.objects.create(title='Write the quarterly report for finance')
+        Task.objects.create(title='Fix login bug')
+
+    def search(self, q, **params):
+        response = self.client.get('/api/tasks/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data
+
+    def titles(self, q, **params):
+        return [task['title'] for task in self.search(q, **params)['results']]
+
+    def test_prefix_matching_and_ranking(self):
+        data = self.search('rep')
+        self.assertEqual(data['backend'], 'fts5')
+        self.assertEqual([task['title'] for task in data['results']],
+                         ['Report', 'Write the quarterly report for finance'])
+        self.assertEqual(self.titles('quart REP'), ['Write the quarterly report for finance'])
+        self.assertEqual(self.titles('missing'), [])
+        # FTS operators are searched as plain words
+        self.assertEqual(self.titles('"login" OR NOT *'), [])
+        self.assertEqual(self.titles('(login*'), ['Fix login bug'])
+
+    def test_index_follows_every_write(self):
+        Task.objects.filter(pk=self.report.pk).update(title='Summary')
+        self.assertEqual(self.titles('summ'), ['Summary'])
+        self.assertEqual(self.titles('report'), ['Write the quarterly report for finance'])
+        self.long.delete()
+        self.assertEqual(self.titles('report'), [])
+        Task.objects.bulk_create([Task(title='Report draft'), Task(title='Report final')])
+        self.assertEqual(len(self.titles('report')), 2)
+
+    def test_pagination_and_projects(self):
+        data = self.search('report', limit=1)
+        self.assertEqual((len(data['results']), data['has_more'], data['next_offset']), (1, True, 1))
+        data = self.search('report', limit=1, offset=1)
+        self.assertEqual((data['results'][0]['title'], data['has_more']), (self.long.title, False))
+        other = Project.objects.create(name='Other')
+        Task.objects.create(project=other, title='Other report')
+        self.assertEqual(len(self.titles('report')), 2)
+        response = self.client.get(f'/api/projects/{other.id}/tasks/search/', {'q': 'report'})
+        self.assertEqual([task['title'] for task in response.data['results']], ['Other report'])
+
+    def test_icontains_fallback(self):
+        with mock.patch.object(search_module, 'fts_available', return_value=False):
+            data = self.search('port')
+        self.assertEqual(data['backend'], 'icontains')
+        self.assertEqual([task['title'] for task in data['results']],
+                         ['Report', 'Write the quarterly report for finance'])
+
+    def test_rebuild_command_restores_dropped_triggers(self):
+        importlib.import_module('tasks.migrations.0004_task_search').remove_search_index(connection)
+        search_module.clear_fts_cache()
+        self.assertEqual(self.search('report')['backend'], 'icontains')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('rebuilt', out.getvalue())
+        Task.objects.create(title='Report again')
+        self.assertEqual(len(self.titles('report')), 3)
+        self.assertEqual(self.search('report')['backend'], 'fts5')
+
+    def test_invalid_queries(self):
+        for params in ({'q': ''}, {'q': '!!'}, {'q': 'x', 'limit': '0'}, {'q': 'x', 'offset': '-1'}):
+            response = self.client.get('/api/tasks/search/', params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class LoadTestTest(TransactionTestCase):
+    # Client threads need committed data; keep the default project row from
+    # the migrations across the flush between tests.
+    serialized_rollback = True
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('list=2, suggest'), {'list': 2, 'suggest': 1})
+        for value in ('search=1', 'list=x', 'list=0', 'list=-1'):
+            with self.assertRaises(ValueError):
+                parse_mix(value)
+
+    def test_summary_percentiles_and_errors(self):
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+        self.assertEqual(percentile([1, 2, 3, 4], 99), 4)
+        samples = [('list', 200, idx / 1000) for idx in range(1, 101)] + [('create', 500, 0.5)]
+        summary = summarize(samples, 2.0)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['endpoints']['list']['p95_ms'], 95.0)
+        self.assertEqual(summary['endpoints']['list']['throughput_rps'], 50.0)
+        self.assertEqual(summary['endpoints']['create']['statuses'], {'500': 1})
+
+    def test_runs_through_wsgi_and_asgi(self):
+        report = run_load_test(mix={'list': 1, 'analyze': 1, 'suggest': 1, 'create': 1}, requests=24,
+                               concurrency=1, size=30, analyze_size=10, warmup=2)
+        self.assertEqual(set(report['results']), {'wsgi', 'asgi'})
+        for result in report['results'].values():
+            self.assertEqual(result['requests'], 24)
+            self.assertEqual(result['errors'], 0, result)
+            self.assertEqual(set(result['endpoints']), {'list', 'analyze', 'suggest', 'create'})
+
+        slower = json.loads(json.dumps(report))
+        slower['results']['wsgi']['p95_ms'] *= 2
+        comparisons = {item['key']: item for item in compare_runs(report, slower)}
+        self.assertTrue(comparisons['wsgi']['regression'])
+        self.assertFalse(comparisons['asgi']['regression'])
+
+
+class TaskAdminTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        invalidate_index()
+        self.addCleanup(invalidate_index)
+        self.base = Task.objects.create(title='Base', importance=2)
+        self.child = Task.objects.create(title='Child', importance=9, dependencies=[str(self.base.id)])
+
+    def changelist(self, **params):
+        response = self.client.get('/admin/tasks/task/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_live_scores_are_batched_per_page(self):
+        results = {task.title: task for task in self.changelist().result_list}
+        weights = get_strategy_weights('smart_balance')
+        table = TaskTable.from_rows(Task.objects.order_by('id').values_list(
+            'id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies'))
+        expected = score_table(table, weights)
+        self.assertEqual(results['Base'].current_score, expected[0])
+        self.assertEqual((results['Base'].dependent_count, results['Child'].dependent_count), (1, 0))
+
+        with CaptureQueriesContext(connection) as small:
+            self.changelist()
+        Task.objects.bulk_create(Task(title=f'Task {idx}', dependencies=[str(self.base.id)]) for idx in range(60))
+        bump_revision(DEFAULT_PROJECT_ID)
+        self.changelist()
+        with CaptureQueriesContext(connection) as large:
+            self.changelist()
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_rescore_action_and_sorting(self):
+        response = self.client.post('/admin/tasks/task/', {
+            'action': 'rescore_selected',
+            '_selected_action': [self.base.id, self.child.id],
+        }, follow=True)
+        self.assertContains(response, 'Rescored 2 task(s)')
+        self.base.refresh_from_db()
+        self.assertIsNotNone(self.base.priority_score)
+        column = TaskAdmin.list_display.index('priority_score')
+        ordered = [task.title for task in self.changelist(o=f'-{column}').result_list]
+        expected = sorted(['Base', 'Child'], key=lambda title: -Task.objects.get(title=title).priority_score)
+        self.assertEqual(ordered, expected)
+
+    def test_rescore_command(self):
+        Task.objects.filter(pk=self.base.pk).update(priority_score=None)
+        out = StringIO()
+        call_command('rescore_tasks', '--date', '2030-01-01', stdout=out)
+        self.assertIn('Rescored 2 task(s)', out.getvalue())
+        self.assertFalse(Task.objects.filter(priority_score__isnull=True).exists())
+
+    def test_stored_score_is_only_a_snapshot(self):
+        call_command('rescore_tasks', stdout=StringIO())
+        stored = Task.objects.get(pk=self.base.pk).priority_score
+        api = APIClient()
+        response = api.put(f'/api/tasks/{self.base.id}/', {'title': 'Base', 'importance': 10}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # API writes leave the snapshot alone; the live score follows the edit.
+        task = Task.objects.get(pk=self.base.pk)
+        self.assertEqual(task.priority_score, stored)
+        annotate_live_scores([task])
+        self.assertGreater(task.current_score, stored)
+        created = api.post('/api/tasks/', {'title': 'New'}, format='json').data['id']
+        self.assertIsNone(Task.objects.get(pk=created).priority_score)
+
+    def test_validate_action_reports_problems(self):
+        Task.objects.filter(pk=self.base.pk).update(dependencies=[str(self.child.id), '999'])
+        response = self.client.post('/admin/tasks/task/', {
+            'action': 'validate_dependencies',
+            '_selected_action': [self.base.id],
+        }, follow=True)
+        self.assertContains(response, f'Task {self.base.id} depends on missing task(s): 999')
+        self.assertContains(response, 'Dependency cycle')
+
+    def test_validate_action_finds_cycles_hidden_from_find_cycles(self):
+        first = Task.objects.create(title='First')
+        second = Task.objects.create(title='Second')
+        third = Task.objects.create(title='Third')
+        Task.objects.filter(pk=first.pk).update(dependencies=[str(second.id)])
+        Task.objects.filter(pk=second.pk).update(dependencies=[str(first.id), str(third.id)])
+        Task.objects.filter(pk=third.pk).update(dependencies=[str(second.id)])
+        bump_revision(DEFAULT_PROJECT_ID)
+        # One cycle is reported per search root, so second <-> third is not listed.
+        graph = get_index(DEFAULT_PROJECT_ID).graph
+        self.assertNotIn(str(third.id), [member for cycle in graph.find_cycles() for member in cycle])
+        problems = dependency_problems([Task.objects.get(pk=third.pk)])
+        self.assertEqual(problems['cycles'], [[str(third.id), str(second.id), str(third.id)]])
+        self.assertEqual(graph.cycle_through(graph.node(str(first.id))),
+                         [str(first.id), str(second.id), str(first.id)])
+        self.assertIsNone(graph.cycle_through(graph.node(str(self.base.id))))
+
+    def test_estimated_count_on_unfiltered_changelist(self):
+        with mock.patch.object(admin_module, 'estimated_row_count', return_value=250000):
+            self.assertEqual(self.changelist().result_count, 250000)
+            self.assertEqual(self.changelist(importance__exact=9).result_count, 1)
+        with mock.patch.object(admin_module, 'estimated_row_count', return_value=None):
+            self.assertEqual(self.changelist().result_count, 2)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE tasks_task')
+        self.assertEqual(admin_module.estimated_row_count(Task), 2)
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(TASKS_PROFILE_DIR=self.tmp.name, TASKS_PROFILE_KEEP=3,
+                                     TASKS_PROFILE_TOKEN='secret', TASKS_PROFILE_SAMPLE_RATE=0.0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client = APIClient()
+        self.tasks = [
+            {'id': str(idx), 'title': f'Task {idx}', 'due_date': '2030-01-10', 'estimated_hours': idx,
+             'importance': idx % 10 + 1, 'dependencies': [str(idx - 1)] if idx else []}
+            for idx in range(20)
+        ]
+
+    def analyze(self, **headers):
+        return self.client.post('/api/tasks/analyze/', self.tasks, format='json', **headers)
+
+    def test_header_with_token_writes_report(self):
+        response = self.analyze(HTTP_X_PROFILE='secret')
+        self.assertEqual(response.status_code, 200)
+        report = profiling_module.load_report(response['X-Profile-Id'])
+        self.assertEqual(report['view'], 'analyze_tasks')
+        self.assertEqual(report['trigger'], 'header')
+        self.assertEqual(report['status'], 200)
+        self.assertGreater(report['memory']['peak_bytes'], 0)
+        self.assertGreaterEqual(report['memory']['peak_bytes'], report['memory']['retained_bytes'])
+        self.assertTrue(report['memory']['top_allocations'])
+        scoring = {row['function'] for row in report['cpu']['scoring']}
+        self.assertIn('score_components', scoring)
+        self.assertTrue(all(row['file'].endswith(profiling_module.HOT_MODULE)
+                            for row in report['cpu']['scoring']))
+        self.assertEqual(profiling_module.load_report('latest')['id'], response['X-Profile-Id'])
+
+    def test_unpermitted_header_is_ignored(self):
+        self.assertNotIn('X-Profile-Id', self.analyze(HTTP_X_PROFILE='wrong'))
+        with override_settings(TASKS_PROFILE_TOKEN=None, DEBUG=False):
+            self.assertNotIn('X-Profile-Id', self.analyze(HTTP_X_PROFILE='1'))
+        with override_settings(TASKS_PROFILE_TOKEN=None, DEBUG=True):
+            self.assertIn('X-Profile-Id', self.analyze(HTTP_X_PROFILE='1'))
+        self.assertEqual(len(profiling_module.list_reports()), 1)
+
+    def test_sampling_and_ring_buffer(self):
+        Task.objects.create(title='Only task')
+        with override_settings(TASKS_PROFILE_SAMPLE_RATE=1.0):
+            ids = [self.client.get('/api/tasks/suggest/')['X-Profile-Id'] for _ in range(5)]
+        self.assertNotIn('X-Profile-Id', self.client.get('/api/tasks/suggest/'))
+        stored = [path.stem for path in profiling_module.list_reports()]
+        self.assertEqual(stored, ids[-3:])
+        report = profiling_module.load_report(ids[-1])
+        self.assertEqual((report['view'], report['trigger']), ('suggest_tasks', 'sample'))
+
+    @override_settings(TASKS_PROFILE_KEEP=0)
+    def test_non_positive_keep_still_bounds_the_ring(self):
+        ids = [self.analyze(HTTP_X_PROFILE='secret')['X-Profile-Id'] for _ in range(3)]
+        self.assertEqual([path.stem for path in profiling_module.list_reports()], ids[-1:])
+
+    def test_overlapping_request_runs_unprofiled(self):
+        profiling_module._profile_lock.acquire()
+        try:
+            response = self.analyze(HTTP_X_PROFILE='secret')
+        finally:
+            profiling_module._profile_lock.release()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+    def test_profile_reports_command(self):
+        report_id = self.analyze(HTTP_X_PROFILE='secret')['X-Profile-Id']
+        out = StringIO()
+        call_command('profile_reports', stdout=out)
+        self.assertIn(report_id, out.getvalue())
+        self.assertIn('/api/tasks/analyze/', out.getvalue())
+
+        out = StringIO()
+        call_command('profile_reports', 'latest', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['id'], report_id)
+        with self.assertRaises(CommandError):
+            call_command('profile_reports', 'missing', stdout=StringIO())
+
+        out = StringIO()
+        call_command('profile_reports', '--clear', stdout=out)
+        self.assertIn('Deleted 1 report(s)', out.getvalue())
+        self.assertEqual(profiling_module.list_reports(), [])
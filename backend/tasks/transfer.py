@@ -0,0 +1,234 @@
+import csv
+import json
+from datetime import date, datetime
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import DEFAULT_PROJECT_ID, Task, TaskTombstone, bump_revision
+from .graph import TaskGraph
+from .serializers import TaskSerializer
+
+FORMATS = ('ndjson', 'csv')
+EXPORT_FIELDS = ('id', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies',
+                 'created_at', 'updated_at')
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportRowError(ValueError):
+    def __init__(self, line: int, detail):
+        self.line = line
+        self.detail = detail
+        super().__init__(f'Line {line}: {detail}')
+
+
+class ImportCycleError(ValueError):
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__('Dependencies form a cycle: ' + ' -> '.join(cycle))
+
+
+def detect_format(path: str, default: str = 'ndjson') -> str:
+    if path.lower().endswith('.csv'):
+        return 'csv'
+    if path.lower().endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+def export_rows(queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    queryset = Task.objects.all() if queryset is None else queryset
+    rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    for task_id, title, due_date, hours, importance, dependencies, created_at, updated_at in rows:
+        yield {
+            'id': str(task_id),
+            'title': title,
+            'due_date': due_date.isoformat() if due_date else None,
+            'estimated_hours': hours,
+            'importance': importance,
+            'dependencies': dependencies,
+            'created_at': created_at.isoformat(),
+            'updated_at': updated_at.isoformat(),
+        }
+
+
+def write_ndjson(tasks: Iterable[Dict], fh: TextIO) -> Iterator[Dict]:
+    for task in tasks:
+        fh.write(json.dumps(task, separators=(',', ':')))
+        fh.write('\n')
+        yield task
+
+
+def write_csv(tasks: Iterable[Dict], fh: TextIO) -> Iterator[Dict]:
+    writer = csv.writer(fh)
+    writer.writerow(EXPORT_FIELDS)
+    for task in tasks:
+        row = [task[field] for field in EXPORT_FIELDS]
+        row[EXPORT_FIELDS.index('due_date')] = task['due_date'] or ''
+        row[EXPORT_FIELDS.index('dependencies')] = json.dumps(task['dependencies'], separators=(',', ':'))
+        writer.writerow(row)
+        yield task
+
+
+WRITERS = {'ndjson': write_ndjson, 'csv': write_csv}
+
+
+def export_tasks(
+    fh: TextIO,
+    fmt: str = 'ndjson',
+    queryset=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+    progress_every: int = 10000
+) -> int:
+    exported = 0
+    for _ in WRITERS[fmt](export_rows(queryset, chunk_size), fh):
+        exported += 1
+        if progress and exported % progress_every == 0:
+            progress(exported)
+    return exported
+
+
+def read_ndjson(fh: TextIO) -> Iterator[Tuple[int, Dict]]:
+    for line_number, line in enumerate(fh, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as exc:
+            raise ImportRowError(line_number, f'invalid JSON ({exc})')
+
+
+def read_csv(fh: TextIO) -> Iterator[Tuple[int, Dict]]:
+    reader = csv.DictReader(fh)
+    for row in reader:
+        dependencies = (row.get('dependencies') or '').strip()
+        try:
+            row['dependencies'] = json.loads(dependencies) if dependencies else []
+        except ValueError:
+            row['dependencies'] = [dep.strip() for dep in dependencies.split(';') if dep.strip()]
+        for field in ('due_date', 'estimated_hours', 'importance'):
+            if row.get(field) == '':
+                row[field] = None
+        yield reader.line_num, row
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def build_task(data: Dict, project_id: int = DEFAULT_PROJECT_ID) -> Task:
+    due_date = data.get('due_date')
+    return Task(
+        project_id=project_id,
+        title=data['title'],
+        due_date=date.fromisoformat(due_date) if due_date else None,
+        estimated_hours=data.get('estimated_hours') or 0,
+        importance=data.get('importance') or 5,
+        dependencies=data.get('dependencies') or []
+    )
+
+
+def restamp_changes(project_id: int, since: datetime) -> None:
+    # Rows keep the time they were inserted, and a large import commits long
+    # after that, possibly behind a sync cursor handed out in between. Once
+    # the import has committed, its tasks and tombstones are stamped again so
+    # the next sync sends them.
+    now = timezone.now()
+    Task.objects.filter(project_id=project_id, updated_at__gte=since).update(updated_at=now)
+    TaskTombstone.objects.filter(project_id=project_id, deleted_at__gte=since).update(deleted_at=now)
+
+
+def import_tasks(
+    fh: TextIO,
+    fmt: str = 'ndjson',
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    clear: bool = False,
+    progress: Optional[Callable[[int], None]] = None,
+    progress_every: int = 10000,
+    project_id: int = DEFAULT_PROJECT_ID
+) -> Dict[str, int]:
+    # Tasks get new primary keys, so dependencies are rewritten from the ids in
+    # the file to the new ids. Dependencies on tasks earlier in the file are
+    # rewritten before insert; rows that reference a later task are fixed up
+    # once everything is in. Only the id mapping grows with the file size.
+    # Everything lands in one project, so remapped dependencies stay inside it.
+    # Dependencies on ids that are not in the file are dropped: the raw id
+    # could match the key of an unrelated stored task.
+    validator = TaskSerializer()
+    id_map: Dict[str, str] = {}
+    deferred: List[int] = []
+    stats = {'imported': 0, 'remapped': 0, 'unresolved': 0}
+    rows = READERS[fmt](fh)
+    next_report = progress_every
+    started = timezone.now()
+
+    with transaction.atomic():
+        if clear:
+            Task.objects.filter(project_id=project_id).delete()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            tasks = []
+            source_ids = []
+            pending = []
+            for line_number, raw in batch:
+                if not isinstance(raw, dict):
+                    raise ImportRowError(line_number, 'expected an object')
+                try:
+                    data = validator.run_validation(raw)
+                except serializers.ValidationError as exc:
+                    raise ImportRowError(line_number, exc.detail)
+                task = build_task(data, project_id)
+                resolved = [id_map.get(dep) for dep in task.dependencies]
+                if None in resolved:
+                    pending.append(len(tasks))
+                else:
+                    task.dependencies = resolved
+                    stats['remapped'] += len(resolved)
+                tasks.append(task)
+                source_ids.append(str(raw['id']) if raw.get('id') not in (None, '') else None)
+
+            Task.objects.bulk_create(tasks)
+            for source_id, task in zip(source_ids, tasks):
+                if source_id is not None:
+                    id_map[source_id] = str(task.pk)
+            deferred.extend(tasks[idx].pk for idx in pending)
+            stats['imported'] += len(tasks)
+            if progress and stats['imported'] >= next_report:
+                progress(stats['imported'])
+                next_report += progress_every
+
+        for start in range(0, len(deferred), batch_size):
+            tasks = list(Task.objects.filter(pk__in=deferred[start:start + batch_size]).only('id', 'dependencies'))
+            for task in tasks:
+                dependencies = []
+                for dep in task.dependencies:
+                    new_id = id_map.get(str(dep))
+                    if new_id is None:
+                        stats['unresolved'] += 1
+                    else:
+                        stats['remapped'] += 1
+                        dependencies.append(new_id)
+                task.dependencies = dependencies
+            Task.objects.bulk_update(tasks, ['dependencies'])
+
+        # bulk_create skips the write path's dependency checks, so the project
+        # graph is checked once before the transaction commits.
+        ids, dependencies = [], []
+        rows = Task.objects.filter(project_id=project_id).values_list('id', 'dependencies')
+        for task_id, deps in rows.iterator(chunk_size=batch_size):
+            ids.append(str(task_id))
+            dependencies.append(deps)
+        cycles = TaskGraph.build(ids, dependencies, count_dependents=False).find_cycles()
+        if cycles:
+            source_ids = {new_id: source_id for source_id, new_id in id_map.items()}
+            raise ImportCycleError([source_ids.get(task_id, task_id) for task_id in cycles[0]])
+        bump_revision(project_id)
+        transaction.on_commit(partial(restamp_changes, project_id, started))
+    return stats
@@ -1,10 +1,27 @@
 from django.urls import path
 from . import views
 
-urlpatterns = [
-    path('tasks/', views.task_list_create, name='task-list-create'),
-    path('tasks/<int:task_id>/', views.task_detail, name='task-detail'),
-    path('tasks/analyze/', views.analyze_tasks, name='analyze-tasks'),
-    path('tasks/suggest/', views.suggest_tasks, name='suggest-tasks'),
-]
 
+def task_routes(prefix='', name_prefix=''):
+    # The same task endpoints are served unprefixed for the default project
+    # and under projects/<project_id>/ for every other project.
+    return [
+        path(f'{prefix}tasks/', views.task_list_create, name=f'{name_prefix}task-list-create'),
+        path(f'{prefix}tasks/<int:task_id>/', views.task_detail, name=f'{name_prefix}task-detail'),
+        path(f'{prefix}tasks/<int:task_id>/ancestors/', views.task_ancestors, name=f'{name_prefix}task-ancestors'),
+        path(f'{prefix}tasks/<int:task_id>/descendants/', views.task_descendants,
+             name=f'{name_prefix}task-descendants'),
+        path(f'{prefix}tasks/analyze/', views.analyze_tasks, name=f'{name_prefix}analyze-tasks'),
+        path(f'{prefix}tasks/suggest/', views.suggest_tasks, name=f'{name_prefix}suggest-tasks'),
+        path(f'{prefix}tasks/changes/', views.task_changes, name=f'{name_prefix}task-changes'),
+        path(f'{prefix}tasks/schedule/', views.schedule_tasks, name=f'{name_prefix}schedule-tasks'),
+        path(f'{prefix}tasks/forecast/', views.forecast_tasks, name=f'{name_prefix}forecast-tasks'),
+        path(f'{prefix}tasks/search/', views.search_tasks, name=f'{name_prefix}search-tasks'),
+    ]
+
+
+urlpatterns = task_routes() + [
+    path('projects/', views.project_list_create, name='project-list-create'),
+] + task_routes('projects/<int:project_id>/', 'project-') + [
+    path('metrics', views.metrics, name='metrics'),
+]
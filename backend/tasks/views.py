@@ -1,33 +1,100 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import datetime
-from .models import Task
-from .serializers import TaskSerializer
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError
+from django.db.models import Count
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+import hmac
+from datetime import date, datetime, timedelta
+from .models import DEFAULT_PROJECT_ID, Project, Task
+from .records import TABLE_FIELDS, TaskTable
+from .serializers import ProjectSerializer, TaskSerializer, TaskTableSerializer
 from .scoring import (
-    calculate_priority_score,
-    get_score_explanation,
-    detect_circular_dependencies,
-    get_strategy_weights
+    detect_table_cycles,
+    explain_index,
+    get_strategy_weights,
+    ranked_indices,
+    score_components,
+    score_table,
+    table_components
 )
+from .scheduling import build_schedule
+from .forecast import MAX_HORIZON, build_forecast
+from .instrumentation import REGISTRY, phase, record_task_count
+from .queries import query_budget
+from .profiling import profiled
+from .ordering import DependencyCycleError, UnknownDependencyError, locked_order
+from .reachability import ANCESTORS, DESCENDANTS, get_index
+from .sync import DEFAULT_LIMIT, MAX_LIMIT, SyncTokenError, SyncTokenExpired, changes_since
+from . import search
 
+RESULT_FIELDS = TABLE_FIELDS + ('priority_score', 'explanation')
+LIST_FIELDS = TABLE_FIELDS + ('created_at', 'updated_at')
+LIST_FORMATTERS = {
+    'id': str,
+    'due_date': date.isoformat,
+    'created_at': datetime.isoformat,
+    'updated_at': datetime.isoformat,
+}
+
+@query_budget(2)
 @api_view(['GET', 'POST'])
-def task_list_create(request):
+def project_list_create(request):
     if request.method == 'GET':
-        tasks = Task.objects.all().order_by('-created_at')
-        tasks_data = []
-        for task in tasks:
-            task_dict = {
-                'id': str(task.id),
-                'title': task.title,
-                'due_date': task.due_date.isoformat() if task.due_date else None,
-                'estimated_hours': task.estimated_hours,
-                'importance': task.importance,
-                'dependencies': task.dependencies,
-                'created_at': task.created_at.isoformat(),
-                'updated_at': task.updated_at.isoformat()
+        projects = Project.objects.annotate(task_count=Count('tasks')).order_by('id')
+        return Response([project_dict(project, project.task_count) for project in projects],
+                        status=status.HTTP_200_OK)
+    
+    serializer = ProjectSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        project = Project.objects.create(name=serializer.validated_data['name'])
+    except IntegrityError:
+        return Response({'name': ['A project with this name already exists.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(project_dict(project, 0), status=status.HTTP_201_CREATED)
+
+def project_dict(project, task_count):
+    return {
+        'id': str(project.id),
+        'name': project.name,
+        'task_count': task_count,
+        'created_at': project.created_at.isoformat()
+    }
+
+def project_scope(project_id):
+    # The unprefixed /api/tasks/ routes act on the default project without a
+    # lookup; nested routes check the project exists so writes cannot orphan.
+    if project_id is None:
+        return DEFAULT_PROJECT_ID, None
+    if not Project.objects.filter(id=project_id).exists():
+        return None, Response({'error': 'Project not found'}, status=status.HTTP_404_NOT_FOUND)
+    return project_id, None
+
+@query_budget(6)
+@api_view(['GET', 'POST'])
+def task_list_create(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    if request.method == 'GET':
+        fields, error_response = requested_fields(request, LIST_FIELDS)
+        if error_response is not None:
+            return error_response
+        rows = Task.objects.filter(project_id=project_id).order_by('-created_at').values_list(*fields)
+        formatters = [LIST_FORMATTERS.get(field) for field in fields]
+        tasks_data = [
+            {
+                field: format_value(value) if format_value and value is not None else value
+                for field, format_value, value in zip(fields, formatters, row)
             }
-            tasks_data.append(task_dict)
+            for row in rows
+        ]
         return Response(tasks_data, status=status.HTTP_200_OK)
     
     elif request.method == 'POST':
@@ -35,6 +102,7 @@ def task_list_create(request):
         if serializer.is_valid():
             validated_data = serializer.validated_data
             task = Task(
+                project_id=project_id,
                 title=validated_data['title'],
                 due_date=validated_data.get('due_date') if validated_data.get('due_date') else None,
                 estimated_hours=validated_data.get('estimated_hours', 0),
@@ -44,26 +112,42 @@ def task_list_create(request):
             if task.due_date and isinstance(task.due_date, str):
                 task.due_date = datetime.strptime(task.due_date, '%Y-%m-%d').date()
             try:
-                task.save()
-                response_data = {
-                    'id': str(task.id),
-                    'title': task.title,
-                    'due_date': task.due_date.isoformat() if task.due_date else None,
-                    'estimated_hours': task.estimated_hours,
-                    'importance': task.importance,
-                    'dependencies': task.dependencies,
-                    'created_at': task.created_at.isoformat(),
-                    'updated_at': task.updated_at.isoformat()
-                }
-                return Response(response_data, status=status.HTTP_201_CREATED)
-            except Exception as e:
+                # The dependency check, the insert and the order update happen
+                # in one transaction under the project lock, so a rejected
+                # graph change rolls the new row back with it.
+                with locked_order(project_id) as order:
+                    order.check_known(task.dependencies)
+                    task.save()
+                    try:
+                        order.set_dependencies(str(task.id), task.dependencies)
+                    except (DependencyCycleError, UnknownDependencyError):
+                        order.remove_task(str(task.id))
+                        raise
+            except (DependencyCycleError, UnknownDependencyError) as e:
+                return dependency_error_response(e)
+            except (ValidationError, DatabaseError) as e:
                 return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            response_data = {
+                'id': str(task.id),
+                'title': task.title,
+                'due_date': task.due_date.isoformat() if task.due_date else None,
+                'estimated_hours': task.estimated_hours,
+                'importance': task.importance,
+                'dependencies': task.dependencies,
+                'created_at': task.created_at.isoformat(),
+                'updated_at': task.updated_at.isoformat()
+            }
+            return Response(response_data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(9)
 @api_view(['GET', 'PUT', 'DELETE'])
-def task_detail(request, task_id):
+def task_detail(request, task_id, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
     try:
-        task = Task.objects.get(id=task_id)
+        task = Task.objects.get(id=task_id, project_id=project_id)
     except Task.DoesNotExist:
         return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -93,73 +177,62 @@ def task_detail(request, task_id):
             task.importance = validated_data.get('importance', task.importance)
             task.dependencies = validated_data.get('dependencies', task.dependencies)
             try:
-                task.save()
-                response_data = {
-                    'id': str(task.id),
-                    'title': task.title,
-                    'due_date': task.due_date.isoformat() if task.due_date else None,
-                    'estimated_hours': task.estimated_hours,
-                    'importance': task.importance,
-                    'dependencies': task.dependencies,
-                    'created_at': task.created_at.isoformat(),
-                    'updated_at': task.updated_at.isoformat()
-                }
-                return Response(response_data, status=status.HTTP_200_OK)
-            except Exception as e:
+                with locked_order(project_id) as order:
+                    order.set_dependencies(str(task.id), task.dependencies)
+                    task.save()
+            except (DependencyCycleError, UnknownDependencyError) as e:
+                return dependency_error_response(e)
+            except (ValidationError, DatabaseError) as e:
                 return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            response_data = {
+                'id': str(task.id),
+                'title': task.title,
+                'due_date': task.due_date.isoformat() if task.due_date else None,
+                'estimated_hours': task.estimated_hours,
+                'importance': task.importance,
+                'dependencies': task.dependencies,
+                'created_at': task.created_at.isoformat(),
+                'updated_at': task.updated_at.isoformat()
+            }
+            return Response(response_data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
-        task.delete()
+        with locked_order(project_id) as order:
+            task_key = str(task.id)
+            strip_dependency(project_id, task_key)
+            task.delete()
+            order.remove_task(task_key)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+@query_budget(1)
+@profiled
 @api_view(['POST'])
-def analyze_tasks(request):
-    if not isinstance(request.data, list):
-        return Response({'error': 'Expected a list of tasks'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    tasks_data = request.data
-    if not tasks_data:
-        return Response({'error': 'Task list cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    serializer = TaskSerializer(data=tasks_data, many=True)
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+def analyze_tasks(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
     
-    validated_tasks = serializer.validated_data
+    fields, error_response = requested_fields(request, RESULT_FIELDS)
+    if error_response is not None:
+        return error_response
     
-    for idx, task in enumerate(validated_tasks):
-        if not task.get('id'):
-            task['id'] = str(idx + 1)
-    
-    circular_deps = detect_circular_dependencies(validated_tasks)
-    if circular_deps:
-        return Response({
-            'error': 'Circular dependencies detected',
-            'cycles': circular_deps
-        }, status=status.HTTP_400_BAD_REQUEST)
+    table, error_response = validated_table(request.data)
+    if error_response is not None:
+        return error_response
     
     strategy = request.query_params.get('strategy', 'smart_balance')
     weights = get_strategy_weights(strategy)
     
-    analyzed_tasks = []
-    for task in validated_tasks:
-        priority_score = calculate_priority_score(task, validated_tasks, weights)
-        explanation = get_score_explanation(task, validated_tasks, weights)
-        
-        task_result = {
-            'id': task.get('id'),
-            'title': task.get('title'),
-            'due_date': task.get('due_date'),
-            'estimated_hours': task.get('estimated_hours', 0),
-            'importance': task.get('importance', 5),
-            'dependencies': task.get('dependencies', []),
-            'priority_score': priority_score,
-            'explanation': explanation
-        }
-        analyzed_tasks.append(task_result)
+    with phase('score'):
+        components = table_components(table)
+        scores = score_components(components, weights)
+    
+    with phase('sort'):
+        order = ranked_indices(scores)
     
-    analyzed_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
+    with phase('explain' if 'explanation' in fields else 'build'):
+        analyzed_tasks = [analysis_result(table, components, scores, idx, fields) for idx in order]
     
     return Response({
         'tasks': analyzed_tasks,
@@ -167,56 +240,332 @@ def analyze_tasks(request):
         'total_tasks': len(analyzed_tasks)
     }, status=status.HTTP_200_OK)
 
+@query_budget(2)
+@profiled
 @api_view(['GET'])
-def suggest_tasks(request):
-    tasks = Task.objects.all()
-    if not tasks.exists():
+def suggest_tasks(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    fields, error_response = requested_fields(request, RESULT_FIELDS)
+    if error_response is not None:
+        return error_response
+    
+    with phase('query'):
+        table = TaskTable.from_rows(Task.objects.filter(project_id=project_id).values_list(*TABLE_FIELDS))
+    record_task_count(len(table))
+    if not len(table):
         return Response({
             'suggestions': [],
             'message': 'No tasks available for suggestions'
         }, status=status.HTTP_200_OK)
     
-    tasks_data = []
-    for task in tasks:
-        task_dict = {
-            'id': str(task.id),
-            'title': task.title,
-            'due_date': task.due_date.isoformat() if task.due_date else None,
-            'estimated_hours': task.estimated_hours,
-            'importance': task.importance,
-            'dependencies': task.dependencies
-        }
-        tasks_data.append(task_dict)
+    strategy = request.query_params.get('strategy', 'smart_balance')
+    weights = get_strategy_weights(strategy)
+    
+    with phase('score'):
+        components = table_components(table)
+        scores = score_components(components, weights)
+    
+    with phase('sort'):
+        top_3 = ranked_indices(scores, limit=3)
+    
+    return Response({
+        'suggestions': [analysis_result(table, components, scores, idx, fields) for idx in top_3],
+        'strategy': strategy,
+        'total_available': len(table)
+    }, status=status.HTTP_200_OK)
+
+@query_budget(2)
+@api_view(['GET', 'POST'])
+def schedule_tasks(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
     
-    for idx, task in enumerate(tasks_data):
-        if not task.get('id'):
-            task['id'] = str(idx + 1)
+    if request.method == 'POST':
+        table, error_response = validated_table(request.data)
+        if error_response is not None:
+            return error_response
+    else:
+        with phase('query'):
+            table = TaskTable.from_rows(Task.objects.filter(project_id=project_id).values_list(*TABLE_FIELDS))
+        record_task_count(len(table))
+        circular_deps = detect_table_cycles(table)
+        if circular_deps:
+            return Response({
+                'error': 'Circular dependencies detected',
+                'cycles': circular_deps
+            }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        capacity = float(request.query_params.get('capacity', 8))
+    except ValueError:
+        return Response({'error': 'Capacity must be a number of hours'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < capacity <= 24:
+        return Response({'error': 'Capacity must be between 0 and 24 hours per day'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    start_date = request.query_params.get('start_date')
+    try:
+        start = date.fromisoformat(start_date) if start_date else date.today()
+    except ValueError:
+        return Response({'error': 'Start date must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if table.graph().has_duplicate_ids:
+        return Response({'error': 'Task ids must be unique to build a schedule'},
+                        status=status.HTTP_400_BAD_REQUEST)
     
     strategy = request.query_params.get('strategy', 'smart_balance')
     weights = get_strategy_weights(strategy)
     
-    analyzed_tasks = []
-    for task in tasks_data:
-        priority_score = calculate_priority_score(task, tasks_data, weights)
-        explanation = get_score_explanation(task, tasks_data, weights)
-        
-        task_result = {
-            'id': task.get('id'),
-            'title': task.get('title'),
-            'due_date': task.get('due_date'),
-            'estimated_hours': task.get('estimated_hours', 0),
-            'importance': task.get('importance', 5),
-            'dependencies': task.get('dependencies', []),
-            'priority_score': priority_score,
-            'explanation': explanation
-        }
-        analyzed_tasks.append(task_result)
+    with phase('score'):
+        scores = score_table(table, weights, current_date=start)
     
-    analyzed_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
-    top_3 = analyzed_tasks[:3]
+    with phase('schedule'):
+        days = build_schedule(table, scores, capacity, start)
     
     return Response({
-        'suggestions': top_3,
+        'days': days,
         'strategy': strategy,
-        'total_available': len(analyzed_tasks)
+        'daily_capacity': capacity,
+        'start_date': start.isoformat(),
+        'end_date': days[-1]['date'] if days else None,
+        'total_days': len(days),
+        'total_hours': round(sum(table.estimated_hours), 4),
+        'total_tasks': len(table)
+    }, status=status.HTTP_200_OK)
+
+MAX_FORECAST_TOP = 50
+
+@query_budget(2)
+@api_view(['GET', 'POST'])
+def forecast_tasks(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        horizon = int(request.query_params.get('horizon', 30))
+        top = int(request.query_params.get('top', 3))
+    except ValueError:
+        return Response({'error': 'Horizon and top must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= horizon <= MAX_HORIZON:
+        return Response({'error': f'Horizon must be between 1 and {MAX_HORIZON} days'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= top <= MAX_FORECAST_TOP:
+        return Response({'error': f'Top must be between 1 and {MAX_FORECAST_TOP}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    start_date = request.query_params.get('start_date')
+    try:
+        start = date.fromisoformat(start_date) if start_date else date.today()
+    except ValueError:
+        return Response({'error': 'Start date must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if request.method == 'POST':
+        table, error_response = validated_table(request.data)
+        if error_response is not None:
+            return error_response
+    else:
+        with phase('query'):
+            table = TaskTable.from_rows(Task.objects.filter(project_id=project_id).values_list(*TABLE_FIELDS))
+        record_task_count(len(table))
+    
+    strategy = request.query_params.get('strategy', 'smart_balance')
+    weights = get_strategy_weights(strategy)
+    
+    with phase('forecast'):
+        days = build_forecast(table, weights, start, horizon, top)
+    
+    return Response({
+        'days': days,
+        'strategy': strategy,
+        'start_date': start.isoformat(),
+        'end_date': (start + timedelta(days=horizon - 1)).isoformat(),
+        'horizon': horizon,
+        'top': top,
+        'total_tasks': len(table)
+    }, status=status.HTTP_200_OK)
+
+@query_budget(3)
+@api_view(['GET'])
+def task_ancestors(request, task_id, project_id=None):
+    return reachable_tasks(request, project_id, task_id, ANCESTORS)
+
+@query_budget(3)
+@api_view(['GET'])
+def task_descendants(request, task_id, project_id=None):
+    return reachable_tasks(request, project_id, task_id, DESCENDANTS)
+
+def reachable_tasks(request, project_id, task_id, direction):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    max_depth = request.query_params.get('depth')
+    if max_depth is not None:
+        if not max_depth.isdigit() or int(max_depth) < 1:
+            return Response({'error': 'Depth must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        max_depth = int(max_depth)
+    count_only = request.query_params.get('count_only', '').lower() in ('1', 'true', 'yes')
+    
+    with phase('query'):
+        index = get_index(project_id)
+    node = index.node(task_id)
+    if node is None:
+        return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    with phase('traverse'):
+        result = index.query(node, direction, max_depth, count_only)
+    record_task_count(result['count'])
+    return Response({
+        'task_id': str(task_id),
+        'direction': direction,
+        'depth': max_depth,
+        **result
     }, status=status.HTTP_200_OK)
+
+@query_budget(3)
+@api_view(['GET'])
+def task_changes(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': 'Limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= MAX_LIMIT:
+        return Response({'error': f'Limit must be between 1 and {MAX_LIMIT}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        with phase('query'):
+            changes = changes_since(project_id, request.query_params.get('since'), limit)
+    except SyncTokenExpired as e:
+        return Response({'error': str(e), 'resync': True}, status=status.HTTP_410_GONE)
+    except SyncTokenError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    record_task_count(len(changes['tasks']))
+    return Response(changes, status=status.HTTP_200_OK)
+
+@query_budget(2)
+@api_view(['GET'])
+def search_tasks(request, project_id=None):
+    project_id, error_response = project_scope(project_id)
+    if error_response is not None:
+        return error_response
+    
+    try:
+        limit = int(request.query_params.get('limit', search.DEFAULT_LIMIT))
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response({'error': 'Limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 1 <= limit <= search.MAX_LIMIT or offset < 0:
+        return Response({'error': f'Limit must be between 1 and {search.MAX_LIMIT} and offset cannot be negative'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        with phase('search'):
+            results = search.search_tasks(project_id, request.query_params.get('q', ''), limit, offset)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    record_task_count(len(results['results']))
+    return Response(results, status=status.HTTP_200_OK)
+
+def dependency_error_response(error):
+    if isinstance(error, DependencyCycleError):
+        return Response({
+            'error': 'Dependencies would create a cycle',
+            'cycle': error.cycle
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'error': 'Dependencies must reference existing tasks',
+        'missing': error.missing
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+def strip_dependency(project_id, task_key):
+    # Removes a deleted task from its dependents in the delete's transaction.
+    # The LIKE prefilter over the stored JSON can match longer ids, so the
+    # lists are checked exactly here.
+    now = timezone.now()
+    dependents = []
+    for dependent in Task.objects.filter(project_id=project_id, dependencies__icontains=task_key):
+        kept = [dep for dep in dependent.dependencies if str(dep) != task_key]
+        if len(kept) != len(dependent.dependencies):
+            dependent.dependencies = kept
+            dependent.updated_at = now
+            dependents.append(dependent)
+    if dependents:
+        Task.objects.bulk_update(dependents, ['dependencies', 'updated_at'])
+
+def validated_table(tasks_data):
+    if not isinstance(tasks_data, list):
+        return None, Response({'error': 'Expected a list of tasks'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not tasks_data:
+        return None, Response({'error': 'Task list cannot be empty'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    record_task_count(len(tasks_data))
+    with phase('validate'):
+        serializer = TaskTableSerializer(data=tasks_data)
+        valid = serializer.is_valid()
+    if not valid:
+        return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    table = serializer.validated_data
+    
+    circular_deps = detect_table_cycles(table)
+    if circular_deps:
+        return None, Response({
+            'error': 'Circular dependencies detected',
+            'cycles': circular_deps
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return table, None
+
+def requested_fields(request, allowed):
+    fields = allowed
+    requested = request.query_params.get('fields')
+    if requested:
+        names = {name.strip() for name in requested.split(',') if name.strip()}
+        unknown = sorted(names.difference(allowed))
+        if unknown:
+            return None, Response({
+                'error': f"Unknown field(s): {', '.join(unknown)}",
+                'allowed': list(allowed)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        fields = tuple(field for field in allowed if field in names)
+    if request.query_params.get('explain', '').lower() in ('false', '0', 'no'):
+        fields = tuple(field for field in fields if field != 'explanation')
+    return fields, None
+
+def analysis_result(table, components, scores, idx, fields=RESULT_FIELDS):
+    if fields is RESULT_FIELDS:
+        task_result = table.task_dict(idx)
+        task_result['priority_score'] = scores[idx]
+        task_result['explanation'] = explain_index(components, idx)
+        return task_result
+    task_result = {}
+    for field in fields:
+        if field == 'priority_score':
+            task_result[field] = scores[idx]
+        elif field == 'explanation':
+            task_result[field] = explain_index(components, idx)
+        else:
+            task_result[field] = table.value(field, idx)
+    return task_result
+
+@query_budget(0)
+def metrics(request):
+    token = getattr(settings, 'TASKS_METRICS_TOKEN', None)
+    if token:
+        scheme, _, supplied = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(supplied.encode(), token.encode()):
+            response = HttpResponse('Unauthorized', status=401, content_type='text/plain')
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+    elif not getattr(settings, 'TASKS_METRICS_PUBLIC', False):
+        raise Http404
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')